@@ -1,6 +1,9 @@
+import itertools
 import os
+import re
 from contextlib import contextmanager
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence
+from weakref import WeakKeyDictionary
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
@@ -10,6 +13,31 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Names usable for prepared statements; they are formatted into PREPARE/EXECUTE as identifiers
+_STATEMENT_NAME_RE = re.compile(r'\w+')
+# String literals, %s placeholders and any other use of % in a statement to be prepared
+_PLACEHOLDER_RE = re.compile(r"'(?:[^']|'')*'|%s|%")
+
+
+def _positional_placeholders(sql: str) -> str:
+    """Rewrite the %s placeholders of a statement as the $1, $2, ... that PREPARE takes
+
+    Raises ValueError for any other use of % (%%, %(name)s) and for % inside a string literal,
+    which psycopg2 and PREPARE would read differently.
+    """
+    counter = itertools.count(1)
+
+    def replace(match):
+        token = match.group()
+        if token == '%s':
+            return f'${next(counter)}'
+        if token.startswith("'") and '%' not in token:
+            return token
+        raise ValueError(f"Cannot prepare a statement with {token!r}; only bare %s placeholders are supported")
+
+    return _PLACEHOLDER_RE.sub(replace, sql)
+
+
 class BaseDatabaseManager:
     def __init__(self, min_conn: int = 1, max_conn: int = 10):
         """Initialize database manager with connection pooling"""
@@ -31,19 +59,21 @@ class BaseDatabaseManager:
         self.min_conn = min_conn
         self.max_conn = max_conn
         self.pool = None
+        # Names of the statements prepared on each pooled connection
+        self._prepared = WeakKeyDictionary()
         self._initialize_pool()
 
     def _initialize_pool(self) -> None:
         """Initialize the connection pool with error handling"""
         try:
             if isinstance(self.connection_params, dict):
-                self.pool = pool.SimpleConnectionPool(
+                self.pool = pool.ThreadedConnectionPool(
                     self.min_conn,
                     self.max_conn,
                     **self.connection_params
                 )
             else:
-                self.pool = pool.SimpleConnectionPool(
+                self.pool = pool.ThreadedConnectionPool(
                     self.min_conn,
                     self.max_conn,
                     dsn=self.connection_params
@@ -68,19 +98,71 @@ class BaseDatabaseManager:
                 self.pool.putconn(conn)
 
     @contextmanager
-    def get_cursor(self, cursor_factory=RealDictCursor):
-        """Context manager for database cursors"""
+    def get_cursor(self, cursor_factory=RealDictCursor, readonly: bool = False,
+                   server_side: bool = False, name: Optional[str] = None, itersize: int = 10000):
+        """Context manager for database cursors
+
+        Read-only cursors run in autocommit mode, skipping the BEGIN/COMMIT round trips.
+        Server-side cursors stream the result itersize rows at a time instead of buffering it all;
+        they need a transaction, so they never run in autocommit mode.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=cursor_factory)
+            autocommit = readonly and not server_side
+            # Only a client-side flag; unlike set_session(readonly=...) it sends nothing to the server
+            conn.autocommit = autocommit
+            if server_side:
+                cursor = conn.cursor(name=name or 'server_side_cursor', cursor_factory=cursor_factory)
+                cursor.itersize = itersize
+            else:
+                cursor = conn.cursor(cursor_factory=cursor_factory)
             try:
-                yield cursor
-                conn.commit()
+                try:
+                    yield cursor
+                finally:
+                    # A server-side cursor has to be closed before its transaction ends
+                    cursor.close()
+                if not autocommit:
+                    conn.commit()
             except Exception as e:
-                conn.rollback()
+                if not autocommit:
+                    conn.rollback()
                 logger.error(f"Database operation error: {str(e)}")
                 raise
             finally:
-                cursor.close()
+                conn.autocommit = False
+
+    @contextmanager
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None, *, name: Optional[str] = None, readonly: bool = False):
+        """Context manager that executes a statement and yields its cursor
+
+        When a name is given, the statement is prepared the first time each pooled
+        connection runs it and later calls run EXECUTE, so Postgres skips parsing and
+        planning it again. Names must be plain identifiers (letters, digits and
+        underscores), and the statement may only use bare %s placeholders.
+        """
+        if name is None:
+            with self.get_cursor(readonly=readonly) as cursor:
+                cursor.execute(sql, params)
+                yield cursor
+            return
+
+        if not _STATEMENT_NAME_RE.fullmatch(name):
+            raise ValueError(f"Invalid prepared statement name: {name!r}")
+        prepare_sql = f"PREPARE {name} AS {_positional_placeholders(sql)}"
+
+        with self.get_cursor(readonly=readonly) as cursor:
+            # Connections the pool closes drop out of this map, so their replacements prepare again
+            prepared = self._prepared.setdefault(cursor.connection, set())
+            if name not in prepared:
+                cursor.execute(prepare_sql)
+                # PREPARE is not undone by a rollback, so the name stays prepared even if EXECUTE fails
+                prepared.add(name)
+
+            if params:
+                cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+            else:
+                cursor.execute(f"EXECUTE {name}")
+            yield cursor
 
     def close(self):
         """Close the connection pool"""
@@ -1,15 +1,41 @@
+import os
 import yaml
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import date as date_type, datetime
+
+def _to_date(value):
+    # YAML gives quoted dates as strings and unquoted ones as dates
+    return value if isinstance(value, date_type) else date_type.fromisoformat(value)
+
+def _count_weekdays(start_ordinal, end_ordinal):
+    """Count the Monday-Friday days between two date ordinals, inclusive, in closed form."""
+    full_weeks, remainder = divmod(end_ordinal - start_ordinal + 1, 7)
+    start_weekday = (start_ordinal - 1) % 7  # Ordinal 1 (0001-01-01) is a Monday
+    return full_weeks * 5 + sum(1 for offset in range(remainder) if (start_weekday + offset) % 7 < 5)
+
+# libyaml's emitter when PyYAML was built with it, otherwise the pure-Python one
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
 class BudgetManager:
-    def __init__(self, config_path='config/time-goals.yaml'):
+    def __init__(self, config_path='config/time-goals.yaml', autosave=True):
         self.config_path = config_path
+        self.autosave = autosave
+        self._batch_depth = 0
+        self._dirty = False
         self.budgets = self.load_budgets()
+        self._index_budgets()
 
     def load_budgets(self):
         with open(self.config_path, 'r') as file:
             return yaml.safe_load(file)['budgets']
 
+    def _index_budgets(self):
+        """Parse budget dates once, in config order and by budget name."""
+        self._date_ranges = [(_to_date(budget['start_date']), _to_date(budget['end_date'])) for budget in self.budgets]
+        self._budget_dates = {}
+        for budget, date_range in zip(self.budgets, self._date_ranges):
+            self._budget_dates.setdefault(budget['name'], date_range)
+
     def get_budget(self, name):
         return next((budget for budget in self.budgets if budget['name'] == name), None)
 
@@ -18,28 +44,49 @@ class BudgetManager:
 
     def add_budget(self, budget):
         self.budgets.append(budget)
-        self.save_budgets()
+        self._budgets_changed()
 
     def update_budget(self, name, new_data):
         budget = self.get_budget(name)
         if budget:
             budget.update(new_data)
-            self.save_budgets()
+            self._budgets_changed()
 
     def delete_budget(self, name):
         self.budgets = [b for b in self.budgets if b['name'] != name]
-        self.save_budgets()
+        self._budgets_changed()
+
+    def _budgets_changed(self):
+        self._index_budgets()
+        self._dirty = True
+        if self.autosave and not self._batch_depth:
+            self.save_budgets()
+
+    @contextmanager
+    def batch(self):
+        """Group several changes into a single write of the config file when the block exits."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth and self._dirty:
+            self.save_budgets()
 
     def save_budgets(self):
-        with open(self.config_path, 'w') as file:
-            yaml.dump({'budgets': self.budgets}, file)
+        # Write to a temporary file and swap it in, so readers never see a partial file
+        tmp_path = f"{self.config_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            yaml.dump({'budgets': self.budgets}, file, Dumper=_YAML_DUMPER)
+        os.replace(tmp_path, self.config_path)
+        self._dirty = False
 
     def get_active_budgets(self, date=None):
         if date is None:
             date = datetime.now().date()
         return [
-            budget for budget in self.budgets
-            if datetime.strptime(budget['start_date'], "%Y-%m-%d").date() <= date <= datetime.strptime(budget['end_date'], "%Y-%m-%d").date()
+            budget for budget, (start_date, end_date) in zip(self.budgets, self._date_ranges)
+            if start_date <= date <= end_date
         ]
 
     def calculate_progress(self, name, actual_value, date=None):
@@ -50,8 +97,7 @@ class BudgetManager:
         if date is None:
             date = datetime.now().date()
 
-        start_date = datetime.strptime(budget['start_date'], "%Y-%m-%d").date()
-        end_date = datetime.strptime(budget['end_date'], "%Y-%m-%d").date()
+        start_date, end_date = self._budget_dates[name]
 
         if date < start_date or date > end_date:
             return None
@@ -62,8 +108,9 @@ class BudgetManager:
         print(f"Total days: {total_days}, Days passed: {days_passed}")
 
         if not budget.get('include_weekends', True):
-            total_days = sum(1 for d in range(total_days) if (start_date + timedelta(d)).weekday() < 5)
-            days_passed = sum(1 for d in range(days_passed) if (start_date + timedelta(d)).weekday() < 5)
+            start_ordinal = start_date.toordinal()
+            total_days = _count_weekdays(start_ordinal, end_date.toordinal())
+            days_passed = _count_weekdays(start_ordinal, date.toordinal())
 
         expected_progress = (budget['target'] / total_days) * days_passed
         actual_progress = actual_value
@@ -18,8 +18,139 @@ Classes:
 
 import numpy as np
 import pandas as pd
-from datetime import timedelta, datetime
-from typing import Optional, Dict, Any, List
+from datetime import datetime
+from functools import reduce
+from typing import Optional, List
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional; without it the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+    prange = range
+
+
+@njit(cache=True, parallel=True)
+def _rolling_mean_std(values, group_bounds, window, out_mean, out_std):
+    """
+    Sliding-window mean and sample standard deviation for contiguous groups of values.
+
+    Each step adds the newest value and removes the one leaving the window with
+    Welford's update, so the cost is O(N) regardless of the window size. NaNs are
+    skipped, and a window needs one value for the mean and two for the std.
+    Groups are independent and write disjoint slices, so they run in parallel.
+
+    Args:
+        values (np.ndarray): Values ordered group by group
+        group_bounds (np.ndarray): Start offset of each group, followed by len(values)
+        window (int): Number of rows in the window
+        out_mean (np.ndarray): Output array for the rolling mean
+        out_std (np.ndarray): Output array for the rolling standard deviation
+    """
+    for g in prange(len(group_bounds) - 1):
+        start, end = group_bounds[g], group_bounds[g + 1]
+        n, mean, m2 = 0, 0.0, 0.0
+        for i in range(start, end):
+            x = values[i]
+            if not np.isnan(x):
+                n += 1
+                delta = x - mean
+                mean += delta / n
+                m2 += delta * (x - mean)
+            if i - window >= start:
+                y = values[i - window]
+                if not np.isnan(y):
+                    n -= 1
+                    if n == 0:
+                        mean, m2 = 0.0, 0.0
+                    else:
+                        delta = y - mean
+                        mean -= delta / n
+                        m2 -= delta * (y - mean)
+            out_mean[i] = mean if n > 0 else np.nan
+            out_std[i] = np.sqrt(max(m2, 0.0) / (n - 1)) if n > 1 else np.nan
+
+class _PandasBackend:
+    """Rolling statistics with pandas' groupby-rolling kernels."""
+
+    def rolling_mean_std(self, df: pd.DataFrame, key: str, column: str, window: int) -> tuple:
+        """
+        Rolling mean and standard deviation of a column within each key, in row order.
+
+        Args:
+            df (pd.DataFrame): Input data
+            key (str): Column to group by
+            column (str): Column to calculate statistics for
+            window (int): Rolling window size in rows
+
+        Returns:
+            tuple: Mean and standard deviation Series on df's index
+        """
+        rolling = df.groupby(key)[column].rolling(window=window, min_periods=1)
+        try:
+            # Numba's JIT rolling kernels, parallel over groups, when numba is installed
+            engine_kwargs = {'parallel': True, 'nogil': True}
+            avg = rolling.mean(engine='numba', engine_kwargs=engine_kwargs)
+            std_dev = rolling.std(engine='numba', engine_kwargs=engine_kwargs)
+        except ImportError:
+            # Both statistics from one pass over the same groups with the Cython kernels
+            stats = rolling.agg(['mean', 'std'])
+            avg, std_dev = stats['mean'], stats['std']
+        # The numba engine may already return the results on the original row index
+        if avg.index.nlevels > 1:
+            avg, std_dev = avg.droplevel(0), std_dev.droplevel(0)
+        return avg, std_dev
+
+
+class _PolarsBackend:
+    """Rolling statistics with polars' multithreaded window expressions."""
+
+    def __init__(self):
+        import polars  # Optional dependency, only needed for engine='polars'
+        self.pl = polars
+
+    def rolling_mean_std(self, df: pd.DataFrame, key: str, column: str, window: int) -> tuple:
+        """
+        Rolling mean and standard deviation of a column within each key, in row order.
+
+        Args:
+            df (pd.DataFrame): Input data
+            key (str): Column to group by
+            column (str): Column to calculate statistics for
+            window (int): Rolling window size in rows
+
+        Returns:
+            tuple: Mean and standard deviation Series on df's index
+        """
+        pl = self.pl
+        stats = pl.from_pandas(df[[key, column]].reset_index(drop=True)).select(
+            pl.col(column).rolling_mean(window, min_samples=1).over(key).alias('avg'),
+            pl.col(column).rolling_std(window, min_samples=1).over(key).alias('std'),
+        ).to_pandas()
+        # pandas drops rows without a key from the groups, so they get no statistics
+        no_key = df[key].isna().to_numpy()
+        stats.loc[no_key, ['avg', 'std']] = np.nan
+        return (pd.Series(stats['avg'].to_numpy(dtype=float), index=df.index),
+                pd.Series(stats['std'].to_numpy(dtype=float), index=df.index))
+
+
+# Rolling statistics backends selectable with CalloutSystem(engine=...)
+_BACKENDS = {
+    'pandas': _PandasBackend,
+    'polars': _PolarsBackend,
+}
+
+# Column dtypes of CalloutSystem.callouts_df. Keys keep whatever type the KEY column has.
+CALLOUT_COLUMN_TYPES = {
+    'key': 'object',
+    'date': 'datetime64[ns]',
+    'check': 'string',
+    'condition': 'string',
+    'more_info': 'string',
+    'value': 'string',
+    'std_devs_away': 'float64',
+}
 
 class CalloutSystem:
     """
@@ -36,43 +167,85 @@ class CalloutSystem:
         callouts_df (pd.DataFrame): DataFrame storing generated callouts
     """
 
-    def __init__(self, df_grouped: pd.DataFrame):
+    def __init__(self, df_grouped: pd.DataFrame, engine: str = 'pandas'):
         """
         Initialize the CalloutSystem.
 
         Args:
             df_grouped (pd.DataFrame): DataFrame containing grouped time series data
                                      Must have 'KEY' and 'DATE' columns
+            engine (str, optional): Backend for the rolling statistics, 'pandas' or 'polars'.
+                                    Defaults to 'pandas'.
         """
+        if engine not in _BACKENDS:
+            raise ValueError(f"Engine must be one of {', '.join(_BACKENDS)}.")
         self.df_grouped = df_grouped
+        self._backend = _BACKENDS[engine]()
         self._initialize_callouts_df()
 
     def _initialize_callouts_df(self) -> None:
         """Initialize the callouts DataFrame with required columns."""
-        self.callouts_df = pd.DataFrame(columns=[
-            'key', 'date', 'check', 'condition', 'more_info',
-            'value', 'std_devs_away'
-        ])
-
-    def calculate_rolling_stats(self, target_column: str, window: int = 7) -> None:
+        self.callouts_df = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in CALLOUT_COLUMN_TYPES.items()})
+        # Callouts from the checks, concatenated into callouts_df in one go by _materialize()
+        self._callouts_parts: List[pd.DataFrame] = []
+        # Whether callouts_df is already in get_callouts() order; filtering keeps the order, new rows do not
+        self._sorted = False
+
+    def _materialize(self) -> None:
+        """Fold the pending callouts from the checks into callouts_df."""
+        if not self._callouts_parts:
+            return
+        combined = pd.concat(self._callouts_parts, ignore_index=True)
+        # Cast once to the declared dtypes so the concat below keeps them instead of promoting to object
+        combined = combined.astype({column: dtype for column, dtype in CALLOUT_COLUMN_TYPES.items() if column in combined})
+        if not self.callouts_df.empty:
+            combined = pd.concat([self.callouts_df, combined], ignore_index=True)
+        self.callouts_df = combined.reindex(columns=self.callouts_df.columns.union(combined.columns, sort=False))
+        self._callouts_parts = []
+        self._sorted = False
+
+    def calculate_rolling_stats(self, target_column: str, window: int = 7, online: bool = False) -> None:
         """
         Calculate rolling statistics for a target column.
 
         Args:
             target_column (str): Column name to calculate statistics for
             window (int, optional): Rolling window size in days. Defaults to 7.
+            online (bool, optional): Use the O(N) sliding-window kernel, which pays off
+                                     for large windows or long series. Defaults to False.
         """
-        group = self.df_grouped.groupby('KEY')[target_column]
-        self.df_grouped[f'{target_column}_7_day_avg'] = (
-            group.rolling(window=window, min_periods=1)
-            .mean()
-            .reset_index(0, drop=True)
-        )
-        self.df_grouped[f'{target_column}_7_day_std_dev'] = (
-            group.rolling(window=window, min_periods=1)
-            .std()
-            .reset_index(0, drop=True)
-        )
+        if online:
+            self._calculate_online_rolling_stats(target_column, window)
+            return
+
+        avg, std_dev = self._backend.rolling_mean_std(self.df_grouped, 'KEY', target_column, window)
+        self.df_grouped[f'{target_column}_7_day_avg'] = avg
+        self.df_grouped[f'{target_column}_7_day_std_dev'] = std_dev
+
+    def _calculate_online_rolling_stats(self, target_column: str, window: int) -> None:
+        """
+        Calculate the rolling statistics with _rolling_mean_std, in the same row order as the groupby path.
+
+        Args:
+            target_column (str): Column name to calculate statistics for
+            window (int): Rolling window size in rows
+        """
+        positions = list(self.df_grouped.groupby('KEY').indices.values())
+        order = np.concatenate(positions) if positions else np.empty(0, dtype=np.intp)
+        group_bounds = np.cumsum([0] + [len(group) for group in positions])
+
+        values = self.df_grouped[target_column].to_numpy(dtype=np.float64)[order]
+        out_mean = np.empty(len(order))
+        out_std = np.empty(len(order))
+        _rolling_mean_std(values, group_bounds, window, out_mean, out_std)
+
+        # Scatter back to row positions; rows without a KEY get NaN like in the groupby path
+        avg = np.full(len(self.df_grouped), np.nan)
+        std_dev = np.full(len(self.df_grouped), np.nan)
+        avg[order] = out_mean
+        std_dev[order] = out_std
+        self.df_grouped[f'{target_column}_7_day_avg'] = avg
+        self.df_grouped[f'{target_column}_7_day_std_dev'] = std_dev
 
     @staticmethod
     def format_number(value: float) -> str:
@@ -85,47 +258,109 @@ class CalloutSystem:
         Returns:
             str: Formatted number string
         """
-        if value >= 1_000_000:
-            return f'{value / 1_000_000:.1f}M'
-        elif value >= 1_000:
-            return f'{value / 1_000:.1f}K'
-        elif value >= 1:
-            return f'{value:.0f}'
-        return f'{value:.2f}'
+        return str(CalloutSystem.format_number_array(np.array([value], dtype=float))[0])
+
+    @staticmethod
+    def format_number_array(values: np.ndarray) -> np.ndarray:
+        """
+        Format an array of numbers with K/M suffixes, choosing the format per element with masks.
+
+        Args:
+            values (np.ndarray): Numbers to format
 
-    def _create_callout_dict(self, row: pd.Series, check_type: str,
-                              condition: str, threshold_value: float,
-                              key_column: str = 'KEY') -> Dict[str, Any]:
+        Returns:
+            np.ndarray: Formatted number strings
+        """
+        values = np.asarray(values, dtype=float)
+        return np.select(
+            [values >= 1_000_000, values >= 1_000, values >= 1],
+            [
+                np.char.add(np.char.mod('%.1f', values / 1_000_000), 'M'),
+                np.char.add(np.char.mod('%.1f', values / 1_000), 'K'),
+                np.char.mod('%.0f', values),
+            ],
+            default=np.char.mod('%.2f', values),
+        ).astype(str)
+
+    def _build_callouts(self, sub_df: pd.DataFrame, target_column: str, check: str, condition: str,
+                        more_info: np.ndarray, key_column: str = 'KEY',
+                        std_devs_away: Optional[np.ndarray] = None) -> pd.DataFrame:
         """
-        Create a dictionary for a single callout.
+        Assemble the callouts for the rows that met a check, one column at a time.
 
         Args:
-            row (pd.Series): Data row
-            check_type (str): Type of check performed
-            condition (str): Condition description
-            threshold_value (float): Threshold value used
+            sub_df (pd.DataFrame): Rows that met the check
+            target_column (str): The column the check was run on.
+            check (str): Check description shared by all rows
+            condition (str): Condition description shared by all rows
+            more_info (np.ndarray): Per-row details
             key_column (str): The column representing the key (default is 'KEY').
+            std_devs_away (np.ndarray, optional): Per-row distance from the rolling average in standard deviations
 
         Returns:
-            dict: Dictionary containing callout information
-        """
-        # Calculate thresholds
-        lower_threshold = self.df_grouped[f'{target_column}_7_day_avg'] - threshold * self.df_grouped[f'{target_column}_7_day_std_dev']
-        upper_threshold = self.df_grouped[f'{target_column}_7_day_avg'] + threshold * self.df_grouped[f'{target_column}_7_day_std_dev']
-
-        # Prepare rows to append to callouts_df
-        new_callouts = row.apply(lambda row: {
-            'key': row[key_column],
-            'date': row['DATE'],
-            'check': f'{check_type} in {target_column.replace("_", " ").lower()}',
-            'condition': f"{target_column.replace('_', ' ').lower()} {condition} {threshold_value}",
-            'more_info': f"Current value: {self.format_number(row[target_column])}",
-            'value': str(row[target_column]),
-            'std_devs_away': round((row[target_column] - self.df_grouped[f'{target_column}_7_day_avg']) / self.df_grouped[f'{target_column}_7_day_std_dev'], 2)
-        }, axis=1)
-
-        # Append the new callouts to the callouts_df attribute
-        self.callouts_df = pd.concat([self.callouts_df, pd.DataFrame(new_callouts.tolist())], ignore_index=True)
+            pd.DataFrame: One callout per row
+        """
+        callouts = {
+            'key': sub_df[key_column].to_numpy(),
+            'date': sub_df['DATE'].to_numpy(),
+            'check': check,
+            'condition': condition,
+            'more_info': more_info,
+            'value': sub_df[target_column].astype(str).to_numpy(),
+        }
+        if std_devs_away is not None:
+            callouts['std_devs_away'] = std_devs_away
+        return pd.DataFrame(callouts)
+
+    def _threshold_check(self, target_column: str, direction: str, threshold: float,
+                         kind: str, key_column: str = 'KEY') -> None:
+        """
+        Queue callouts for the rows of a column that are above or below a threshold.
+
+        Args:
+            target_column (str): The column to check the condition on.
+            direction (str): 'above' or 'below'
+            threshold (float): Number of standard deviations from the rolling average for kind 'std_dev',
+                               or the value itself for kind 'absolute'.
+            kind (str): 'std_dev' or 'absolute'
+            key_column (str): The column representing the key (default is 'KEY').
+        """
+        if direction not in ('above', 'below'):
+            raise ValueError("Direction must be either 'above' or 'below'.")
+        operator = '>' if direction == 'above' else '<'
+        label = target_column.replace('_', ' ').lower()
+        values = self.df_grouped[target_column].to_numpy(dtype=float)
+        fmt = self.format_number_array
+
+        if kind == 'std_dev':
+            avg = self.df_grouped[f'{target_column}_7_day_avg'].to_numpy(dtype=float)
+            std = self.df_grouped[f'{target_column}_7_day_std_dev'].to_numpy(dtype=float)
+            bound = avg + threshold * std if direction == 'above' else avg - threshold * std
+        elif kind == 'absolute':
+            bound = threshold
+        else:
+            raise ValueError("Kind must be either 'std_dev' or 'absolute'.")
+
+        mask = values > bound if direction == 'above' else values < bound
+        values = values[mask]
+
+        if kind == 'std_dev':
+            avg, std, bound = avg[mask], std[mask], bound[mask]
+            check = f"{'Spike' if direction == 'above' else 'Drop'} in {label}"
+            condition = f"{operator} {threshold} standard deviation from L7 average {label}"
+            more_info = reduce(np.char.add, [
+                fmt(values), f" {operator} ", fmt(bound),
+                " (L7 avg: ", fmt(avg), ", L7 std dev: ", fmt(std), ")"
+            ])
+            std_devs_away = np.round((values - avg) / std, 2)
+        else:
+            check = condition = f"{label} {operator} {self.format_number(threshold)}"
+            more_info = np.char.add("Current value: ", fmt(values))
+            std_devs_away = None
+
+        self._callouts_parts.append(self._build_callouts(
+            self.df_grouped[mask], target_column, check, condition, more_info, key_column, std_devs_away
+        ))
 
     def check_drop_in_column(self, target_column: str, key_column: str = 'KEY', threshold: int = 2) -> None:
         """
@@ -136,22 +371,7 @@ class CalloutSystem:
             key_column (str): The column representing the key (default is 'KEY').
             threshold (int, optional): The threshold to compare against. Defaults to 2.
         """
-        # Filter rows where the value is below the threshold
-        drops_df = self.df_grouped[self.df_grouped[target_column] < self.df_grouped[f'{target_column}_7_day_avg'] - threshold * self.df_grouped[f'{target_column}_7_day_std_dev']]
-
-        # Prepare rows to append to callouts_df
-        new_callouts = drops_df.apply(lambda row: {
-            'key': row[key_column],
-            'date': row['DATE'],
-            'check': f'Drop in {target_column.replace("_", " ").lower()}',
-            'condition': f"< {threshold} standard deviation from L7 average {target_column.replace('_', ' ').lower()}",
-            'more_info': f"{self.format_number(row[target_column])} < {self.format_number(row[f'{target_column}_7_day_avg'] - threshold * row[f'{target_column}_7_day_std_dev'])} (L7 avg: {self.format_number(row[f'{target_column}_7_day_avg'])}, L7 std dev: {self.format_number(row[f'{target_column}_7_day_std_dev'])})",
-            'value': str(row[target_column]),
-            'std_devs_away': round((row[target_column] - row[f'{target_column}_7_day_avg']) / row[f'{target_column}_7_day_std_dev'], 2)
-        }, axis=1)
-
-        # Convert to DataFrame and concatenate with callouts_df
-        self.callouts_df = pd.concat([self.callouts_df, pd.DataFrame(new_callouts.tolist())], ignore_index=True)
+        self._threshold_check(target_column, 'below', threshold, 'std_dev', key_column)
 
     def check_spike_in_column(self, target_column: str, key_column: str = 'KEY', threshold: int = 2) -> None:
         """
@@ -162,22 +382,7 @@ class CalloutSystem:
             key_column (str): The column representing the key (default is 'KEY').
             threshold (int, optional): The threshold to compare against. Defaults to 2.
         """
-        # Filter rows where the value is above the threshold
-        spikes_df = self.df_grouped[self.df_grouped[target_column] > self.df_grouped[f'{target_column}_7_day_avg'] + threshold * self.df_grouped[f'{target_column}_7_day_std_dev']]
-
-        # Prepare rows to append to callouts_df
-        new_callouts = spikes_df.apply(lambda row: {
-            'key': row[key_column],
-            'date': row['DATE'],
-            'check': f'Spike in {target_column.replace("_", " ").lower()}',
-            'condition': f"> {threshold} standard deviation from L7 average {target_column.replace('_', ' ').lower()}",
-            'more_info': f"{self.format_number(row[target_column])} > {self.format_number(row[f'{target_column}_7_day_avg'] + threshold * row[f'{target_column}_7_day_std_dev'])} (L7 avg: {self.format_number(row[f'{target_column}_7_day_avg'])}, L7 std dev: {self.format_number(row[f'{target_column}_7_day_std_dev'])})",
-            'value': str(row[target_column]),
-            'std_devs_away': round((row[target_column] - row[f'{target_column}_7_day_avg']) / row[f'{target_column}_7_day_std_dev'], 2)
-        }, axis=1)
-
-        # Convert to DataFrame and concatenate with callouts_df
-        self.callouts_df = pd.concat([self.callouts_df, pd.DataFrame(new_callouts.tolist())], ignore_index=True)
+        self._threshold_check(target_column, 'above', threshold, 'std_dev', key_column)
 
     def check_condition_in_column(self, target_column: str, condition: str, threshold: float, key_column: str = 'KEY') -> None:
         """
@@ -190,58 +395,48 @@ class CalloutSystem:
             key_column (str): The column representing the key (default is 'KEY').
 
         Returns:
-            None: Updates the callouts_df attribute.
-        """
-        # Apply the condition to filter rows
-        if condition == '>':
-            condition_df = self.df_grouped[self.df_grouped[target_column] > threshold]
-            condition_text = f"> {self.format_number(threshold)}"
-        elif condition == '<':
-            condition_df = self.df_grouped[self.df_grouped[target_column] < threshold]
-            condition_text = f"< {self.format_number(threshold)}"
-        else:
+            None: Adds to the callouts_df attribute.
+        """
+        if condition not in ('>', '<'):
             raise ValueError("Condition must be either '>' or '<'.")
+        self._threshold_check(target_column, 'above' if condition == '>' else 'below', threshold, 'absolute', key_column)
 
-        # Prepare rows to append to callouts_df
-        new_callouts = condition_df.apply(lambda row: {
-            'key': row[key_column],
-            'date': row['DATE'],
-            'check': f'{target_column.replace("_", " ").lower()} {condition_text}',
-            'condition': f"{target_column.replace('_', ' ').lower()} {condition_text}",
-            'more_info': f"Current value: {self.format_number(row[target_column])}",
-            'value': str(row[target_column]),
-        }, axis=1)
-
-        # Append the new callouts to the callouts_df attribute
-        self.callouts_df = pd.concat([self.callouts_df, pd.DataFrame(new_callouts.tolist())], ignore_index=True)
-        
+    def _filter_date_range(self, start_date: np.datetime64, end_date: np.datetime64) -> None:
+        """Keep the callouts dated within [start_date, end_date], comparing day-resolution datetime64 arrays."""
+        dates = pd.to_datetime(self.callouts_df['date']).to_numpy().astype('datetime64[D]')
+        self.callouts_df = self.callouts_df[(dates >= start_date) & (dates <= end_date)]
 
     def filter_last_week(self):
+        self._materialize()
         # Filter for only the last 7 days excluding today
-        today = datetime.now().date()
-        start_date = today - timedelta(days=7)
-        end_date = today - timedelta(days=1)
-        self.callouts_df = self.callouts_df[(self.callouts_df['date'] >= start_date) & (self.callouts_df['date'] <= end_date)]
+        today = np.datetime64(datetime.now().date(), 'D')
+        self._filter_date_range(today - np.timedelta64(7, 'D'), today - np.timedelta64(1, 'D'))
 
 
     def add_buffer_days(self, buffer_days = 3):
+        self._materialize()
         # Filter for only the last 7 days excluding last buffer_days days
-        today = datetime.now().date()
-        start_date = today - timedelta(days=buffer_days+7)
-        end_date = today - timedelta(days=buffer_days)
-        self.callouts_df = self.callouts_df[(self.callouts_df['date'] >= start_date) & (self.callouts_df['date'] <= end_date)]
+        today = np.datetime64(datetime.now().date(), 'D')
+        self._filter_date_range(today - np.timedelta64(buffer_days + 7, 'D'), today - np.timedelta64(buffer_days, 'D'))
+
+    def _is_ordered(self) -> bool:
+        """Whether callouts_df is sorted by date descending, then std_devs_away ascending."""
+        dates = self.callouts_df['date'].to_numpy()
+        std_devs = self.callouts_df['std_devs_away'].to_numpy()
+        # NaT/NaN compare false, so frames holding them are always sorted (which puts them last)
+        newer_first = dates[1:] < dates[:-1]
+        same_day_in_order = (dates[1:] == dates[:-1]) & (std_devs[1:] >= std_devs[:-1])
+        return bool(np.all(newer_first | same_day_in_order))
 
     def get_callouts(self):
-
-        if 'date' in self.callouts_df.columns:
-            if 'std_devs_away' in self.callouts_df.columns:
-                self.callouts_df = self.callouts_df.sort_values(['date', 'std_devs_away'], ascending=[False, True])
-                return self.callouts_df
-            self.callouts_df = self.callouts_df.sort_values('date', ascending=False)
+        self._materialize()
+        if self._sorted:
             return self.callouts_df
 
-        if 'metric' in self.callouts_df.columns:
-            self.callouts_df = self.callouts_df.sort_values('metric', ascending=True)
-            return self.callouts_df
-            
+        # Newest first, smallest deviation first within a day; a linear check spares the sort
+        # when the rows already come in that order
+        if not self._is_ordered():
+            self.callouts_df = self.callouts_df.sort_values(['date', 'std_devs_away'], ascending=[False, True], kind='mergesort')
+
+        self._sorted = True
         return self.callouts_df
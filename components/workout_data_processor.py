@@ -1,64 +1,110 @@
 import pandas as pd
-from fuzzywuzzy import process
+from rapidfuzz import fuzz, process, utils
 from components.workout_database_manager import WorkoutDatabaseManager
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
+import json
+import os
+import sys
+
+# Standard exercise names, built once at import and interned so mapping values share one str object each
+_STANDARD_EXERCISE_NAMES: tuple[str, ...] = tuple(sys.intern(name) for name in ["Back squat", "Leg curl", "Leg press", "Calf raises", "Bench press", "Front raise", "Incline bench", "Lateral raise", "Triceps extension", "Shoulder press", "Arnold press", "Ez skull crusher", "Forearm bar roll", "Dumbbell press", "Triceps cable pushdown", "Deadlift", "RDL", "T row barbell", "Leg extension", "Pull ups", "Barbell row", "Preacher curl", "Biceps curl", "Cable row", "Hammer curl", "Lat pull", "One Arm Dumbbell Row", "Rear delt flyes", "Face pull", "Concentration curl", "Seated chest flyes"])
+
+# Fuzzy matches persisted across sessions, so each raw exercise name is only matched once
+EXERCISE_NAME_MAPPING_PATH = "files/exercise_name_mapping.json"
 
 class WorkoutDataProcessor:
-    def __init__(self, db_manager: WorkoutDatabaseManager):
+    def __init__(self, db_manager: WorkoutDatabaseManager, mapping_path: str = EXERCISE_NAME_MAPPING_PATH):
         self.db_manager = db_manager
-        self.exercise_name_mapping = {}  # Cache for exercise name mapping
+        self.mapping_path = mapping_path
+        self._standard_names = self.get_standard_exercise_names()
+        self.exercise_name_mapping = self._load_exercise_name_mapping()  # Cache for exercise name mapping
+
+    def _load_exercise_name_mapping(self) -> dict:
+        """
+        Load the saved exercise name mapping, keeping only entries that map to a current standard name.
+        """
+        try:
+            with open(self.mapping_path) as file:
+                saved = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        standard_names = set(self._standard_names)
+        return {exercise: sys.intern(name) for exercise, name in saved.items() if name in standard_names}
+
+    def _save_exercise_name_mapping(self) -> None:
+        """
+        Save the exercise name mapping, writing to a temporary file first so a crash can't truncate it.
+        """
+        os.makedirs(os.path.dirname(self.mapping_path) or '.', exist_ok=True)
+        tmp_path = f"{self.mapping_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.exercise_name_mapping, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.mapping_path)
 
     def clean_exercise_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Clean and standardize exercise names using fuzzy matching.
         """
-        unique_exercises = df['exercise_name'].unique()
-        for exercise in unique_exercises:
-            if exercise not in self.exercise_name_mapping:
-                # Use fuzzy matching to find the closest standard name
-                standard_name, _ = process.extractOne(exercise, self.get_standard_exercise_names())
-                print(f"Mapping {exercise} to {standard_name}")
-                self.exercise_name_mapping[exercise] = standard_name
+        new_exercises = [e for e in df['exercise_name'].unique() if e not in self.exercise_name_mapping]
+        if new_exercises:
+            # Score all new names against the standard names in one batched call and take the best match
+            scores = process.cdist(new_exercises, self._standard_names, scorer=fuzz.WRatio,
+                                   processor=utils.default_process, workers=-1)
+            matches = dict(zip(new_exercises, map(self._standard_names.__getitem__, scores.argmax(axis=1))))
+            print(f"Mapping {matches}")
+            self.exercise_name_mapping.update(matches)
+            self._save_exercise_name_mapping()
         
-        df['exercise_name'] = df['exercise_name'].map(self.exercise_name_mapping)
+        # Categorical over the standard names, so later groupbys and filters work on integer codes
+        df['exercise_name'] = pd.Categorical(df['exercise_name'].map(self.exercise_name_mapping), categories=self._standard_names)
         return df
 
-    def get_standard_exercise_names(self) -> list:
+    def get_standard_exercise_names(self) -> tuple[str, ...]:
         """
-        Retrieve a list of standard exercise names from the database or a predefined list.
+        Retrieve the standard exercise names from the database or a predefined list.
         """
         # TODO: Implement logic to get standard exercise names
-        return ["Back squat", "Leg curl", "Leg press", "Calf raises", "Bench press", "Front raise", "Incline bench", "Lateral raise", "Triceps extension", "Shoulder press", "Arnold press", "Ez skull crusher", "Forearm bar roll", "Dumbbell press", "Triceps cable pushdown", "Deadlift", "RDL", "T row barbell", "Leg extension", "Pull ups", "Barbell row", "Preacher curl", "Biceps curl", "Cable row", "Hammer curl", "Lat pull", "One Arm Dumbbell Row", "Rear delt flyes", "Face pull", "Concentration curl", "Seated chest flyes"]
+        return _STANDARD_EXERCISE_NAMES
 
     def get_workouts(self, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Retrieve workouts for a given user and date range.
+        The rows are cached by the database manager until a workout is added; callers get a copy they are free to mutate.
         """
-        workouts = self.db_manager.get_workouts(start_date, end_date)
-        df = pd.DataFrame(workouts)
+        df = self.db_manager.get_workouts_cached(start_date, end_date)
         df['date'] = pd.to_datetime(df['date'])
-        df['week'] = df['date'].dt.to_period('W').apply(lambda r: r.start_time)
+        df['week'] = df['date'].dt.to_period('W').dt.start_time
         df['volume'] = df['weight_kg'] * df['reps']
-        
         return self.clean_exercise_names(df)
 
+    def get_volume_progression(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Retrieve per-day exercise volume totals, aggregated by the database.
+        Cached by the database manager alongside get_workouts; callers get a copy they are free to mutate.
+        """
+        df = self.db_manager.get_volume_progression_cached(start_date, end_date)
+        df['date'] = pd.to_datetime(df['date'])
+        df['week'] = pd.to_datetime(df['week'])
+        df = self.clean_exercise_names(df)
+        # Raw names that map to the same standard name are combined into one row
+        return self.aggregate_workout_data(df, ['date', 'week', 'muscle_group', 'exercise_name'], {'weight_kg': 'max', 'reps': 'sum', 'volume': 'sum', 'set_number': 'max'})
+
     def aggregate_workout_data(self, df: pd.DataFrame, groupby: list, agg_func: dict) -> pd.DataFrame:
         """
         Aggregate workout data based on specified grouping and aggregation functions.
         """
-        return df.groupby(groupby).agg(agg_func).reset_index()
+        return df.groupby(groupby, observed=True).agg(agg_func).reset_index()
 
-    def prepare_volume_progression_data(self, start_date: str, end_date: str) -> tuple[go.Figure, go.Figure, go.Figure]:
+    def prepare_volume_progression_data(self, start_date: str, end_date: str) -> go.Figure:
         """
         Prepare data for volume progression visualization using stacked bar charts.
         Groups exercises by muscle group and stacks them to show total volume contribution.
+        Volume, weight and reps are drawn as rows of one faceted figure.
         """
 
-        df = self.get_workouts(start_date, end_date)
-        st.write(df)
-        volume_data_grouped = self.aggregate_workout_data(df, ['date', 'week', 'muscle_group', 'exercise_name'], {'weight_kg': 'max', 'reps': 'sum', 'volume': 'sum', 'set_number': 'max'})
+        volume_data_grouped = self.get_volume_progression(start_date, end_date)
         st.write(volume_data_grouped)
 
         fig = px.bar(volume_data_grouped, x="muscle_group", y="volume",
@@ -67,74 +113,51 @@ class WorkoutDataProcessor:
              height=400)
         st.write(fig)
 
-        # Create separate figures for each visualization
-        fig_volume = go.Figure()
-        fig_weight = go.Figure()
-        fig_reps = go.Figure()
-
         # Get unique muscle groups and assign colors
         muscle_groups = volume_data_grouped['muscle_group'].unique()
         colors = px.colors.qualitative.Set3[:len(muscle_groups)]
         color_map = dict(zip(muscle_groups, colors))
 
-        # Create stacked bar charts
-        for muscle_group in muscle_groups:
-            muscle_group_data = volume_data_grouped[volume_data_grouped['muscle_group'] == muscle_group]
-            base_color = color_map[muscle_group]
-            
-            # Generate slightly different shades for exercises within the same muscle group
-            exercises = muscle_group_data['exercise_name'].unique()
-        
-            for idx, exercise_name in enumerate(exercises):
-                exercise_data = muscle_group_data[muscle_group_data['exercise_name'] == exercise_name]
-                
-            # Volume chart
-            fig_volume.add_trace(go.Bar(
-                x=exercise_data['date'],
-                y=exercise_data['volume'],
-                name=f"{muscle_group} - {exercise_name}",
-                legendgroup=muscle_group,
-                marker_color=base_color,
-                showlegend=True
-            ))
-            
-            # Weight chart
-            fig_weight.add_trace(go.Bar(
-                x=exercise_data['date'],
-                y=exercise_data['weight_kg'],
-                name=f"{muscle_group} - {exercise_name}",
-                legendgroup=muscle_group,
-                marker_color=base_color,
-                showlegend=True
-            ))
-            
-            # Reps chart
-            fig_reps.add_trace(go.Bar(
-                x=exercise_data['date'],
-                y=exercise_data['reps'],
-                name=f"{muscle_group} - {exercise_name}",
-                legendgroup=muscle_group,
-                marker_color=base_color,
-                showlegend=True
-            ))
-
-        # Update layout for all charts
-        for fig, title, ylabel in [
-            (fig_volume, "Daily Volume (Weight × Reps) by Exercise", "Volume"),
-            (fig_weight, "Daily Maximum Weight by Exercise", "Weight (kg)"),
-            (fig_reps, "Daily Total Reps by Exercise", "Reps")
-        ]:
-            fig.update_layout(
-                title=title,
-                xaxis_title="Day",
-                yaxis_title=ylabel,
-                template="plotly_white",
-                height=600,
-                width=1000,
-                barmode='stack',
-                legend=dict(
+        # One series per (muscle group, exercise), coloured by muscle group
+        series = volume_data_grouped['muscle_group'].astype(str) + " - " + volume_data_grouped['exercise_name'].astype(str)
+        series_colors = dict(zip(series, volume_data_grouped['muscle_group'].map(color_map)))
+
+        # Keep exercises of a muscle group together, in order of first appearance
+        muscle_group_order = {muscle_group: idx for idx, muscle_group in enumerate(muscle_groups)}
+        series_order = sorted(series_colors, key=lambda name: muscle_group_order[name.split(" - ", 1)[0]])
+
+        # Long format, one row per (day, series, metric), so a single px call builds every trace
+        metrics = {'volume': "Volume", 'weight_kg': "Weight (kg)", 'reps': "Reps"}
+        progression = (
+            volume_data_grouped[['date', 'muscle_group']]
+            .assign(series=series)
+            .join(volume_data_grouped[list(metrics)].rename(columns=metrics))
+            .melt(id_vars=['date', 'muscle_group', 'series'], value_vars=list(metrics.values()), var_name='metric')
+        )
+
+        fig = px.bar(
+            progression,
+            x='date',
+            y='value',
+            color='series',
+            facet_row='metric',
+            color_discrete_map=series_colors,
+            category_orders={'series': series_order, 'metric': list(metrics.values())},
+            labels={'date': "Day", 'series': ""},
+            title="Daily Volume (Weight × Reps), Maximum Weight and Total Reps by Exercise",
+        )
+
+        # Each metric keeps its own scale, labelled by its facet
+        fig.update_yaxes(matches=None, title_text="")
+        fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=", 1)[-1]))
+        fig.update_layout(
+            template="plotly_white",
+            height=1500,
+            width=1000,
+            barmode='stack',
+            legend=dict(
                 yanchor="top",
-                y=-0.1,
+                y=-0.05,
                 xanchor="left",
                 x=0,
                 orientation="h"
@@ -142,24 +165,17 @@ class WorkoutDataProcessor:
             margin=dict(b=150)  # Add bottom margin for legend
         )
 
-        # Display charts in Streamlit
-        st.write("### Volume Progression")
-        st.plotly_chart(fig_volume, use_container_width=True)
-        
-        st.write("### Weight Progression")
-        st.plotly_chart(fig_weight, use_container_width=True)
-        
-        st.write("### Reps Progression")
-        st.plotly_chart(fig_reps, use_container_width=True)
+        # Display the chart in Streamlit
+        st.write("### Volume, Weight and Reps Progression")
+        st.plotly_chart(fig, use_container_width=True)
 
-        return fig_volume, fig_weight, fig_reps
+        return fig
 
     def prepare_exercise_frequency_data(self, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Prepare data for exercise frequency visualization.
         """
         df = self.get_workouts(start_date, end_date)
-        df['week'] = pd.to_datetime(df['date']).dt.to_period('W').apply(lambda r: r.start_time)
         frequency_data_grouped = df.groupby(['week', 'muscle_group']).size().reset_index(name='count')
 
         fig_frequency = go.Figure()
@@ -1,11 +1,70 @@
 from components.base_database_manager import BaseDatabaseManager
+from psycopg2.extras import execute_values
 from typing import Dict, Any, Optional
+import io
 import pandas as pd
+import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import logging
 import streamlit as st
 logger = logging.getLogger(__name__)
 
+# Column types of the get_workouts result, used to parse the COPY output without inference
+WORKOUT_COLUMN_TYPES = {
+    'date': pa.date32(),
+    'muscle_group': pa.string(),
+    'exercise_name': pa.string(),
+    'set_number': pa.int32(),
+    'weight_kg': pa.float64(),
+    'reps': pa.int32(),
+    'notes': pa.string(),
+}
+def read_workouts_csv(source) -> pd.DataFrame:
+    """Parse the CSV that COPY writes for the workouts query into the frame get_workouts returns
+
+    COPY writes NULL as an empty field and an empty string as "", so only unquoted empty
+    fields become nulls and empty notes stay ''.
+    """
+    table = pacsv.read_csv(
+        source,
+        convert_options=pacsv.ConvertOptions(
+            column_types=WORKOUT_COLUMN_TYPES,
+            null_values=[''],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        )
+    )
+    return table.to_pandas()
+
+# Seconds the cached workout reads are kept; add_workout() drops them straight away
+WORKOUT_CACHE_TTL = 3600
+
+@st.cache_data(ttl=WORKOUT_CACHE_TTL, show_spinner=False)
+def _cached_workouts(_db_manager: "WorkoutDatabaseManager", start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
+    """Workout rows for a date range, cached across Streamlit reruns and sessions"""
+    return _db_manager.get_workouts_fast(start_date, end_date)
+
+@st.cache_data(ttl=WORKOUT_CACHE_TTL, show_spinner=False)
+def _cached_volume_progression(_db_manager: "WorkoutDatabaseManager", start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
+    """Database-aggregated volume totals for a date range, cached across Streamlit reruns and sessions"""
+    return _db_manager.get_volume_progression(start_date, end_date)
+
+@st.cache_resource(show_spinner=False)
+def _migrate_indexes(_db_manager: "WorkoutDatabaseManager") -> bool:
+    """Run the one-off index migration once per process; a failed run isn't cached, so it is retried"""
+    _db_manager.migrate_indexes()
+    return True
+
 class WorkoutDatabaseManager(BaseDatabaseManager):
+    def __init__(self, *args, **kwargs):
+        """Initialize the connection pool and, once per process, migrate the workout indices"""
+        super().__init__(*args, **kwargs)
+        try:
+            _migrate_indexes(self)
+        except Exception as e:
+            logger.error(f"Index migration failed: {e}")
+
     def setup_tables(self):
         """Create necessary tables for the workout application"""
         create_tables_sql = """
@@ -30,9 +89,11 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
             created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
         );
 
-        -- Create indices for better performance
-        CREATE INDEX IF NOT EXISTS idx_workouts_date ON workouts(date);
-        CREATE INDEX IF NOT EXISTS idx_exercises_workout ON exercises(workout_id);
+        -- Create indices for better performance. The date filter and the join can be answered
+        -- from (date, workout_id) alone, and sets come back per workout already in
+        -- exercise/set order. These supersede the single-column indices.
+        CREATE INDEX IF NOT EXISTS idx_workouts_date_wid ON workouts(date, workout_id);
+        CREATE INDEX IF NOT EXISTS idx_exercises_wid_ord ON exercises(workout_id, exercise_name, set_number);
         """
         
         with self.get_cursor() as cursor:
@@ -42,6 +103,25 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
             except Exception as e:
                 logger.error(f"Database connection error: {e}")
 
+    def migrate_indexes(self):
+        """Drop the single-column indices superseded by the composite ones and refresh planner statistics
+
+        Takes locks and scans both tables, so it runs once per process from __init__ rather than on every setup_tables().
+        """
+        self.setup_tables()
+        migrate_sql = """
+        DROP INDEX IF EXISTS idx_workouts_date;
+        DROP INDEX IF EXISTS idx_exercises_workout;
+
+        -- Refresh planner statistics so the composite indices are considered right away
+        ANALYZE workouts;
+        ANALYZE exercises;
+        """
+
+        with self.get_cursor() as cursor:
+            cursor.execute(migrate_sql)
+            logger.info("Workout indices migrated successfully")
+
     def add_workout(self, workout_data: Dict[str, Any]) -> int:
         """Add a new workout with exercises"""
         with self.get_cursor() as cursor:
@@ -61,7 +141,8 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
                 )
                 workout_id = cursor.fetchone()['workout_id']
 
-                # Insert exercises
+                # Collect every set, then insert them all in one batched statement
+                set_rows = []
                 for exercise in workout_data['exercises']:
                     # Debug print
                     if st.session_state.get('debug'):
@@ -81,17 +162,21 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
                             st.write(f"Adding set: {exercise_name} - Set {set_number}")
                             st.write(f"Weight: {weight}, Reps: {rep}, Volume: {volume}, Notes: {note}")
                         
-                        cursor.execute(
-                            """
-                            INSERT INTO exercises (workout_id, exercise_name, set_number, weight_kg, reps, volume, notes)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (workout_id, exercise_name, set_number, weight, rep, volume, note)
-                        )
+                        set_rows.append((workout_id, exercise_name, set_number, weight, rep, volume, note))
+
+                if set_rows:
+                    execute_values(
+                        cursor,
+                        """
+                        INSERT INTO exercises (workout_id, exercise_name, set_number, weight_kg, reps, volume, notes)
+                        VALUES %s
+                        """,
+                        set_rows,
+                        page_size=len(set_rows)
+                    )
 
                 # Success notification
                 st.success("Workout added successfully!")
-                return workout_id
             except Exception as e:
                 # Error notification
                 st.error("Failed to add workout. Please try again.")
@@ -99,12 +184,29 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
                 st.error(f"Error details: {str(e)}")
                 raise
 
-    def get_workouts(
-        self, 
-        start_date: Optional[str] = None, 
-        end_date: Optional[str] = None
-    ) -> pd.DataFrame:
-        """Get user workouts with optional date filtering"""
+        # Only once the insert has committed, so a concurrent read can't cache the old rows again
+        self.invalidate_cache()
+        return workout_id
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop the cached workout reads, e.g. after new workouts are written"""
+        _cached_workouts.clear()
+        _cached_volume_progression.clear()
+
+    def get_workouts_cached(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """get_workouts_fast, cached until the TTL expires or add_workout writes a new workout
+
+        Every call returns a fresh copy, so callers are free to mutate it.
+        """
+        return _cached_workouts(self, start_date, end_date)
+
+    def get_volume_progression_cached(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """get_volume_progression, cached like get_workouts_cached"""
+        return _cached_volume_progression(self, start_date, end_date)
+
+    def _workouts_query(self, start_date: Optional[str], end_date: Optional[str]) -> tuple[str, list]:
+        """Build the workouts query and its params for the optional date filters"""
         query = """
         SELECT 
             w.date,
@@ -118,26 +220,132 @@ class WorkoutDatabaseManager(BaseDatabaseManager):
         JOIN exercises e ON w.workout_id = e.workout_id
         WHERE 1=1
         """
+        date_filters, params = self._date_filters(start_date, end_date)
+        query += date_filters
+
+        query += " ORDER BY w.date DESC, e.exercise_name, e.set_number"  # Changed back to set_number
+        return query, params
+
+    def _date_filters(self, start_date: Optional[str], end_date: Optional[str]) -> tuple[str, list]:
+        """Build the AND clauses and params for the optional workout date filters"""
+        clauses = ""
         params = []
 
         if start_date:
-            query += " AND w.date >= %s"
+            clauses += " AND w.date >= %s"
             params.append(start_date)
         if end_date:
-            query += " AND w.date <= %s"
+            clauses += " AND w.date <= %s"
             params.append(end_date)
 
-        query += " ORDER BY w.date DESC, e.exercise_name, e.set_number"  # Changed back to set_number
+        return clauses, params
 
-        with self.get_cursor() as cursor:
-            try:
-                if st.session_state.get('debug'):
-                    st.write("Executing query:", query, "With params:", params)
+    def get_workouts(
+        self, 
+        start_date: Optional[str] = None, 
+        end_date: Optional[str] = None,
+        stream: bool = False
+    ) -> pd.DataFrame:
+        """Get user workouts with optional date filtering
+
+        With stream=True the rows come through a server-side cursor in batches, for large date ranges.
+        """
+        query, params = self._workouts_query(start_date, end_date)
+
+        if stream:
+            return self._stream_workouts(query, params)
+
+        # One prepared statement per combination of date filters
+        statement_name = f"get_workouts_{int(bool(start_date))}{int(bool(end_date))}"
+
+        try:
+            if st.session_state.get('debug'):
+                st.write("Executing query:", query, "With params:", params)
+            with self.execute(query, params, name=statement_name, readonly=True) as cursor:
+                result = cursor.fetchall()
+            if st.session_state.get('debug'):
+                st.write("Query result:", result)
+            return pd.DataFrame(result)
+        except Exception as e:
+            logger.error(f"Database connection error: {e}")
+            raise
+
+    def _stream_workouts(self, query: str, params: list, itersize: int = 10000) -> pd.DataFrame:
+        """Run the workouts query on a server-side cursor and collect the rows column by column"""
+        columns = []
+        data = []
+        try:
+            with self.get_cursor(cursor_factory=None, readonly=True, server_side=True,
+                                 name='stream_workouts', itersize=itersize) as cursor:
                 cursor.execute(query, params)
+                while rows := cursor.fetchmany(itersize):
+                    if not data:
+                        columns = [column.name for column in cursor.description]
+                        data = [[] for _ in columns]
+                    for values, column_data in zip(zip(*rows), data):
+                        column_data.extend(values)
+            return pd.DataFrame(dict(zip(columns, data)))
+        except Exception as e:
+            logger.error(f"Database connection error: {e}")
+            raise
+
+    def get_volume_progression(
+        self, 
+        start_date: Optional[str] = None, 
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Get per-day, per-exercise volume totals aggregated in Postgres
+
+        Returns one row per (date, week, muscle_group, exercise_name) instead of one per set.
+        """
+        date_filters, params = self._date_filters(start_date, end_date)
+        query = f"""
+        SELECT 
+            w.date,
+            date_trunc('week', w.date)::date AS week,
+            w.muscle_group,
+            e.exercise_name,
+            MAX(e.weight_kg)::float8 AS weight_kg,
+            SUM(e.reps) AS reps,
+            SUM(e.weight_kg * e.reps)::float8 AS volume,
+            MAX(e.set_number) AS set_number
+        FROM workouts w
+        JOIN exercises e ON w.workout_id = e.workout_id
+        WHERE 1=1{date_filters}
+        GROUP BY 1, 2, 3, 4
+        ORDER BY 1, 2, 3, 4
+        """
+
+        # One prepared statement per combination of date filters
+        statement_name = f"get_volume_progression_{int(bool(start_date))}{int(bool(end_date))}"
+
+        try:
+            with self.execute(query, params, name=statement_name, readonly=True) as cursor:
                 result = cursor.fetchall()
-                if st.session_state.get('debug'):
-                    st.write("Query result:", result)
-                return pd.DataFrame(result)
-            except Exception as e:
-                logger.error(f"Database connection error: {e}")
-                raise
+            return pd.DataFrame(result)
+        except Exception as e:
+            logger.error(f"Database connection error: {e}")
+            raise
+
+    def get_workouts_fast(
+        self, 
+        start_date: Optional[str] = None, 
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Get user workouts by streaming COPY output straight into Arrow columns
+
+        Skips building a dict per row on the client. Falls back to get_workouts if the COPY fails.
+        """
+        query, params = self._workouts_query(start_date, end_date)
+
+        try:
+            buffer = io.BytesIO()
+            with self.get_cursor(readonly=True) as cursor:
+                # COPY takes no bind parameters, so let psycopg2 quote them into the query
+                copy_sql = f"COPY ({cursor.mogrify(query, params).decode()}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+                cursor.copy_expert(copy_sql, buffer)
+            buffer.seek(0)
+            return read_workouts_csv(buffer)
+        except (psycopg2.Error, pa.ArrowInvalid) as e:
+            logger.warning(f"COPY of workouts failed, falling back to get_workouts: {e}")
+            return self.get_workouts(start_date, end_date)
@@ -3,6 +3,9 @@ from datetime import datetime
 import re
 import streamlit as st  # For debugging output
 
+# Notes are written in parentheses after an exercise, e.g. "(push next)"
+_NOTES_RE = re.compile(r'\((.*?)\)')
+
 class WorkoutLogParser:
     def __init__(self):
         # Define schema
@@ -17,8 +20,9 @@ class WorkoutLogParser:
             'notes'
         ]
         
-        # Initialize empty DataFrame
-        self.df = pd.DataFrame(columns=self.columns)
+        # Parsed rows from every call, turned into a DataFrame only when df is read
+        self._rows = []
+        self._df = None
         
         # Define common rep patterns
         self.rep_patterns = {
@@ -27,13 +31,20 @@ class WorkoutLogParser:
             # Add more patterns as needed
         }
 
+    @property
+    def df(self):
+        """All parsed sets so far as a DataFrame, rebuilt only after new rows are parsed."""
+        if self._df is None:
+            self._df = pd.DataFrame(self._rows, columns=self.columns)
+        return self._df
+
     def _extract_notes(self, line):
         """Extract and remove notes from the line."""
         notes = ''
-        notes_match = re.search(r'\((.*?)\)', line)
+        notes_match = _NOTES_RE.search(line)
         if notes_match:
             notes = notes_match.group(1).strip()
-            line = re.sub(r'\(.*?\)', '', line).strip()
+            line = _NOTES_RE.sub('', line).strip()
         return line, notes
 
     def _parse_reps(self, reps_str, num_weights):
@@ -48,15 +59,16 @@ class WorkoutLogParser:
             else:
                 raise ValueError(f"Unexpected number of weights ({num_weights}) for 'usual' reps")
         
+        # int() and float() already skip the spaces around each value
         try:
-            return [int(r.strip()) for r in reps_str.split(',')]
+            return list(map(int, reps_str.split(',')))
         except ValueError as e:
             raise ValueError(f"Error parsing reps: {reps_str}. {str(e)}")
 
     def _parse_weights(self, weights_str):
         """Parse weights string with validation."""
         try:
-            return [float(w.strip()) for w in weights_str.split(',')]
+            return list(map(float, weights_str.split(',')))
         except ValueError as e:
             raise ValueError(f"Error parsing weights: {weights_str}. {str(e)}")
 
@@ -132,10 +144,10 @@ class WorkoutLogParser:
                 })
                 set_num += 1
 
-        # Convert to DataFrame
-        new_df = pd.DataFrame(data)
-        self.df = pd.concat([self.df, new_df], ignore_index=True)
-        return new_df
+        # Keep the rows for the summaries and return this call's DataFrame
+        self._rows.extend(data)
+        self._df = None
+        return pd.DataFrame(data)
 
     def get_exercise_summary(self, exercise_name=None, start_date=None, end_date=None):
         """Get summary statistics for specified exercise(s)."""
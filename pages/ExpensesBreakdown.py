@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from utility.expenses_base import fetch_only_expenses, fetch_default_expenses, fetch_hover_text
+from utility.expenses_base import fetch_filtered_expenses, fetch_hover_text, join_hover_text
 from components.datatable_callout import CalloutSystem
 
 st.set_page_config(
@@ -36,26 +38,43 @@ def create_time_chart(df, view_type, group_by):
 
     x_values, title, xaxis_title = view_type_mapping[view_type]
 
-    # Group the data by the chosen expense level and date grouping
-    grouped_df = df.groupby([x_values, 'Expense_1', 'Expense_2', 'Expense_3', 'Description', 'Date'])['Amount'].sum().reset_index()
-    grouped_df = grouped_df.sort_values(x_values)
+    # Total the amount per date grouping and category; these are the only keys the bars need
+    grouped_df = df.groupby([x_values, group_by], observed=True)['Amount'].agg(Amount='sum', Transactions='count')
+
+    # One row per date grouping and one column per category, so every trace is a column of the
+    # same frame; periods without a category stay NaN and draw no bar
+    amounts = grouped_df['Amount'].unstack(group_by).sort_index()
+    transactions = grouped_df['Transactions'].unstack(group_by).sort_index()
+
+    # List each bar's transactions in its hover, largest first
+    by_amount = df.sort_values('Amount', ascending=False)
+    hover_text = pd.Series(fetch_hover_text(by_amount), index=by_amount.index)
+    details = (
+        hover_text.groupby([by_amount[x_values], by_amount[group_by]], observed=True).agg(join_hover_text)
+        .unstack(group_by)
+        .reindex(index=amounts.index, columns=amounts.columns)
+    )
+
+    # Format the date grouping as axis labels only after grouping and sorting
+    if view_type == 'daily':
+        x_labels = amounts.index.strftime('%Y-%m-%d')
+    else:
+        x_labels = amounts.index.astype(str)
 
     # Create the figure and add traces
     fig = go.Figure()
 
-    # Get unique categories
-    categories = grouped_df[group_by].unique()
+    # Hover details ship as raw customdata and are formatted client-side by the template
+    hovertemplate = "%{fullData.name}<br>%{x}, %{y:.2f} ₹ over %{customdata[0]} transactions<br><br>%{customdata[1]}<extra></extra>"
 
-    # Create a stacked bar chart
-    for category in categories:
-        category_df = grouped_df[grouped_df[group_by] == category]
+    # Create a stacked bar chart with one trace per category column
+    for category in amounts.columns:
         fig.add_trace(go.Bar(
-            x=category_df[x_values],
-            y=category_df['Amount'],
+            x=x_labels,
+            y=amounts[category].to_numpy(),
             name=category,
-            hoverinfo='text',
-            customdata=category_df[['Expense_1', 'Expense_2', 'Expense_3', 'Description', 'Date']],
-            hovertemplate=fetch_hover_text(category_df), 
+            customdata=np.column_stack([transactions[category].to_numpy(), details[category].to_numpy()]),
+            hovertemplate=hovertemplate,
         ))
 
     fig.update_layout(
@@ -69,6 +88,58 @@ def create_time_chart(df, view_type, group_by):
 
     return fig
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_time_charts(df, group_by):
+    """
+    Create the monthly, daily, and weekly charts for the same data concurrently,
+    memoized per data and grouping so switching back to a selection skips the groupbys.
+
+    :param df: DataFrame containing the expense data
+    :param group_by: The level of grouping ('Expense_1', 'Expense_2', 'Expense_3')
+    :return: Dictionary of Plotly figures keyed by view type
+    """
+    view_types = ['monthly', 'daily', 'weekly']
+    # Each chart only reads df, so the three groupbys can overlap
+    with ThreadPoolExecutor(max_workers=len(view_types)) as executor:
+        figures = executor.map(lambda view_type: create_time_chart(df, view_type, group_by), view_types)
+        return dict(zip(view_types, figures))
+
+@st.fragment
+def show_expense_breakdown(df):
+    # Group by options (Expense_1, Expense_2, Expense_3)
+    group_by_option = st.selectbox("Group by", ["Expense_2", "Expense_1", "Expense_3"])
+    figures = create_time_charts(df, group_by_option)
+
+    # Tabs for daily, weekly, and monthly views
+    tab3, tab1, tab2 = st.tabs(["Monthly View", "Daily View", "Weekly View"])
+
+    # Render the charts for each tab
+    with tab3:
+        st.plotly_chart(figures['monthly'], use_container_width=True)
+    with tab2:
+        st.plotly_chart(figures['weekly'], use_container_width=True)
+    with tab1:
+        st.plotly_chart(figures['daily'], use_container_width=True)
+
+@st.fragment
+def show_category_breakdown(df):
+    # Filter by Expense_2 and display a breakdown by Expense_3
+    expense_2_filter = st.selectbox("Filter by Expense_2", df["Expense_2"].dropna().unique())
+
+    # Filter data based on the selected Expense_2
+    filtered_df = df[(df['Expense_2'] == expense_2_filter) & (df['Expense_1'] == 'Expenses')]
+    figures = create_time_charts(filtered_df, 'Expense_3')
+
+    # Tabs for daily, weekly, and monthly views of filtered data by Expense_3
+    tab4, tab5, tab6 = st.tabs([f"Monthly - {expense_2_filter}", f"Daily - {expense_2_filter}", f"Weekly - {expense_2_filter}"])
+
+    with tab4:
+        st.plotly_chart(figures['monthly'], use_container_width=True)
+    with tab5:
+        st.plotly_chart(figures['daily'], use_container_width=True)
+    with tab6:
+        st.plotly_chart(figures['weekly'], use_container_width=True)
+
 st.title("Expense Dashboard")
 
 with st.form("Expense Type"):
@@ -76,56 +147,12 @@ with st.form("Expense Type"):
     home_loan_option = st.checkbox("Include Home Loan", value=True)
     submit_button = st.form_submit_button("Submit")
 
-df = fetch_only_expenses()
-# st.dataframe(df)
-
-if submit_button:
-
-    if expense_type == "All":
-        df = fetch_only_expenses()
-    elif expense_type == "Default Expenses":
-        df = fetch_default_expenses()
-
-    if not home_loan_option:
-        df = df[df['Expense_3'] != 'Loan']
-
-# Group by options (Expense_1, Expense_2, Expense_3)
-group_by_option = st.selectbox("Group by", ["Expense_2", "Expense_1", "Expense_3"])
-
-# Tabs for daily, weekly, and monthly views
-tab3, tab1, tab2 = st.tabs(["Monthly View", "Daily View", "Weekly View"])
-
-# Create charts for each tab
-with tab3:
-    fig_monthly = create_time_chart(df, 'monthly', group_by_option)
-    st.plotly_chart(fig_monthly, use_container_width=True)
-with tab2:
-    fig_weekly = create_time_chart(df, 'weekly', group_by_option)
-    st.plotly_chart(fig_weekly, use_container_width=True)
-with tab1:
-    fig_daily = create_time_chart(df, 'daily', group_by_option)
-    st.plotly_chart(fig_daily, use_container_width=True)
-
-# Filter by Expense_2 and display a breakdown by Expense_3
-expense_2_filter = st.selectbox("Filter by Expense_2", df["Expense_2"].dropna().unique())
-
-# Filter data based on the selected Expense_2
-filtered_df = df[(df['Expense_2'] == expense_2_filter) & (df['Expense_1'] == 'Expenses')]
-
-# Tabs for daily, weekly, and monthly views of filtered data by Expense_3
-tab4, tab5, tab6 = st.tabs([f"Monthly - {expense_2_filter}", f"Daily - {expense_2_filter}", f"Weekly - {expense_2_filter}"])
-
-with tab6:
-    fig_daily_filtered = create_time_chart(filtered_df, 'daily', 'Expense_3')
-    st.plotly_chart(fig_daily_filtered, use_container_width=True)
-
-with tab5:
-    fig_weekly_filtered = create_time_chart(filtered_df, 'weekly', 'Expense_3')
-    st.plotly_chart(fig_weekly_filtered, use_container_width=True)
+# Form widgets keep their submitted values across reruns, so this is a cache hit after the first load
+df = fetch_filtered_expenses(expense_type, home_loan_option)
 
-with tab4:
-    fig_monthly_filtered = create_time_chart(filtered_df, 'monthly', 'Expense_3')
-    st.plotly_chart(fig_monthly_filtered, use_container_width=True)
+# Each section reruns on its own when its selectbox changes
+show_expense_breakdown(df)
+show_category_breakdown(df)
 
 # # Integrate CalloutSystem for dynamic callouts
 # callout_system = CalloutSystem(df)
@@ -3,67 +3,107 @@ from openai import OpenAI
 import os
 from dotenv import load_dotenv
 import random
+import json
+from itertools import chain
+import time
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from botocore.exceptions import ClientError
 
-# Load environment variables from .env file
-load_dotenv()
+# Streamlit re-executes this script on every interaction, so one-time setup lives in
+# cache_resource functions that only run once per server process
 
-# Initialize the OpenAI client with the API key from the environment variable
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-)
+@st.cache_resource
+def load_environment():
+    # Load environment variables from .env file
+    load_dotenv()
 
-# Function to read and process topics from the S3 file
-def load_topics_from_s3(bucket_name, s3_file_key):
+@st.cache_resource
+def get_openai_client():
+    # Initialize the OpenAI client with the API key from the environment variable
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+    )
+
+@st.cache_resource
+def get_s3_client():
+    # Building a boto3 client loads the service model and resolves credentials, which costs
+    # more than the requests this page makes; clients are thread-safe, so one is shared
+    return boto3.client('s3')
+
+load_environment()
+
+# Lines starting with these are headings or embedded images rather than topics
+_SKIPPED_TOPIC_PREFIXES = ("#", "Pasted image")
+
+# Function to read and process topics from the S3 file, cached until the object changes
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_topics_from_s3(bucket_name, s3_file_key, last_modified=None):
+    """
+    Download and parse the topics file.
+
+    last_modified is only part of the cache key: pass the object's LastModified
+    so a re-uploaded file is downloaded again. Errors propagate, so failures aren't cached.
+    Returns a tuple so cached results can't be mutated by callers.
+    """
     print("Processing topics from S3 file:", s3_file_key)
     topics = []
 
-    # Initialize the S3 client
-    s3_client = boto3.client('s3')
-    
+    # Download the file content from S3
+    file_content = get_s3_client().get_object(Bucket=bucket_name, Key=s3_file_key)
+    file_data = file_content['Body'].read().decode('utf-8')  # Read and decode file content as string
+
+    in_properties_section = False
+    for line in file_data.splitlines():
+        # Check for the start and end of the properties section
+        if line.strip() == "---":
+            in_properties_section = not in_properties_section
+            continue
+
+        if in_properties_section:
+            continue
+
+        # Extract the topic from the line, removing any markdown formatting (e.g., [[topic]])
+        topic = line.replace("[[", "").replace("]]", "").strip()
+        # Ignore blank lines, heading text and embedded images
+        if topic and not topic.startswith(_SKIPPED_TOPIC_PREFIXES) and not topic.endswith("png"):
+            topic = topic.split('.', 1)[-1].strip()  # Remove serial numbering
+            topics.append(topic)
+
+    return tuple(topics)
+
+def fetch_topics(bucket_name, s3_file_key):
+    """Return the topics, re-downloading the file only when its LastModified changes"""
     try:
-        # Download the file content from S3
-        file_content = s3_client.get_object(Bucket=bucket_name, Key=s3_file_key)
-        file_data = file_content['Body'].read().decode('utf-8')  # Read and decode file content as string
-        
-        in_properties_section = False
-        for line in file_data.splitlines():
-            # Check for the start and end of the properties section
-            if line.strip() == "---":
-                in_properties_section = not in_properties_section
-                continue
-
-            if in_properties_section:
-                continue
-
-            # Extract the topic from the line
-            line = line.strip()
-            if line:
-                # Remove any markdown formatting (e.g., [[topic]])
-                topic = line.replace("[[", "").replace("]]", "").strip()  # Replace [[ and ]] with empty characters
-                # Ignore heading text and remove serial numbering followed by .
-                if not topic.startswith("#") and not topic.startswith("Pasted image") and not topic.endswith("png"):
-                    topic = topic.split('.', 1)[-1].strip()  # Remove serial numbering
-                    topics.append(topic)
-                        
-    except s3_client.exceptions.NoSuchKey:
-        print(f"Error: The file {s3_file_key} was not found in the bucket {bucket_name}.")
+        last_modified = get_s3_client().head_object(Bucket=bucket_name, Key=s3_file_key)['LastModified']
+        return load_topics_from_s3(bucket_name, s3_file_key, last_modified)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            print(f"Error: The file {s3_file_key} was not found in the bucket {bucket_name}.")
+        else:
+            print(f"An error occurred: {e}")
     except Exception as e:
         print(f"An error occurred: {e}")
-
-    st.session_state.topics = topics
-
-    return topics
+    return ()
 
 # Load topics from the OBSIDIAN_KVIZZING_PATH file
 bucket_name = "obsidian-notes-storage"  # Your S3 bucket name
 s3_file_key = "ThoughtDenS3/000 Zettelkasten/Kvizzing.md"  # Your S3 object key (i.e., the file path in S3)
 
-# Load topics from the S3 bucket
-st.session_state.topics = load_topics_from_s3(bucket_name, s3_file_key)
-
 from typing import Optional
 
+# Responses already streamed onto the page during this run. Streamlit re-executes the
+# script on every interaction, so this starts empty each time.
+_streamed_messages = []
+# Label shown ahead of each model response
+_RESPONSE_PREFIX = "**Response:** \n "
+
+def stream_chat_tokens(response):
+    """Yield the text of each chunk of a streamed chat completion"""
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 def get_chat_response(user_request: str, context: Optional[str] = None) -> str:
     """
     Get a response from the chat model based on the user request and optional context.
@@ -88,22 +128,23 @@ def get_chat_response(user_request: str, context: Optional[str] = None) -> str:
     # Add user request to messages
     st.session_state.messages.append({"role": "user", "content": user_request})
 
-    # Get response from the chat model
-    response = client.chat.completions.create(
-        model="gpt-4o-mini", messages=st.session_state.messages, temperature=0.5
+    # Stream the response from the chat model, rendering it as the tokens arrive
+    response = get_openai_client().chat.completions.create(
+        model="gpt-4o-mini", messages=st.session_state.messages, temperature=0.5, stream=True
     )
+    streamed = st.write_stream(chain([_RESPONSE_PREFIX], stream_chat_tokens(response)))
     print("Got LLM response")
+    content = streamed[len(_RESPONSE_PREFIX):]
 
-    # Add assistant's response to messages
-    st.session_state.messages.append({"role": "assistant", "content": response.choices[0].message.content})
+    # Add assistant's response to messages, noting it is already on the page for this run
+    message = {"role": "assistant", "content": content}
+    st.session_state.messages.append(message)
+    _streamed_messages.append(message)
     
-    return response.choices[0].message.content
-
-# Function to fetch trivia from OpenAI
-def fetch_trivia(topic):
-    print(f"Fetching trivia for: {topic}")
+    return content
 
-    prompt = f"""
+# Prompt used to ask for trivia about a topic
+_TRIVIA_TEMPLATE = """
         Tell some interesting trivia or 'did you know' facts about {topic}. 
         Keep the tone of the response as if its being told by a friend, skip the salutations. 
         And keep it chill, don't overdo it.
@@ -118,19 +159,106 @@ def fetch_trivia(topic):
         What are the core theories or concepts in {topic} that one needs to understand to grasp it fully?
         Do not hallucinate. Skip if you don't know.
     """
-    
+
+# Seconds a topic's trivia is reused before asking the model again
+TRIVIA_CACHE_TTL = 86400
+# Random topics whose trivia is fetched ahead of time, in a single request
+TRIVIA_BATCH_SIZE = 5
+
+@st.cache_resource
+def get_trivia_cache():
+    # Trivia by topic as (fetched_at, trivia), shared by all sessions. A plain dict rather than
+    # cache_data, since batched fetches fill in several topics at once
+    return {}
+
+@st.cache_resource
+def get_prewarm_executor():
+    # Background worker that fetches upcoming topics while the current trivia is being read
+    return ThreadPoolExecutor(max_workers=1)
+
+def get_cached_trivia(topic, cache=None):
+    """Return the cached trivia for topic, or None if it is missing or expired"""
+    cached = (get_trivia_cache() if cache is None else cache).get(topic)
+    if cached and time.time() - cached[0] < TRIVIA_CACHE_TTL:
+        return cached[1]
+    return None
+
+def store_trivia(cache, trivia_by_topic):
+    """Cache trivia by topic, dropping expired entries so the shared dict doesn't grow for the life of the process"""
+    now = time.time()
+    # list() snapshots the entries, since the prefetch worker and the script thread both write
+    for topic, (fetched_at, _) in list(cache.items()):
+        if now - fetched_at >= TRIVIA_CACHE_TTL:
+            cache.pop(topic, None)
+    cache.update((topic, (now, trivia)) for topic, trivia in trivia_by_topic.items())
+
+# Function to fetch trivia from OpenAI
+def fetch_trivia(topic):
+    print(f"Fetching trivia for: {topic}")
+
+    prompt = _TRIVIA_TEMPLATE.format(topic=topic)
+
+    trivia = get_cached_trivia(topic)
+    if trivia is not None:
+        # Record the exchange as if it had just happened, so the chat shows it and can follow up on it
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        st.session_state.messages.append({"role": "assistant", "content": trivia})
+        return trivia
+
     chat_response = get_chat_response(prompt)
+    store_trivia(get_trivia_cache(), {topic: chat_response})
 
     return chat_response
 
+def fetch_trivia_batch(topics, client, cache):
+    """
+    Fetch trivia for several topics with a single chat request and cache each of them.
+
+    The chat API takes one conversation per request, so the batch is asked for as a JSON
+    array with one entry per topic. Runs outside the script thread, so it doesn't touch
+    session state, the page or any st.cache_resource function: the caller resolves the
+    OpenAI client and the trivia cache and passes them in.
+    """
+    topics = [topic for topic in topics if get_cached_trivia(topic, cache) is None]
+    if not topics:
+        return
+
+    print(f"Prefetching trivia for: {topics}")
+    prompt = (
+        _TRIVIA_TEMPLATE.format(topic="the topic")
+        + "\nDo this separately for each of these topics: " + json.dumps(topics)
+        + '\nReply with a JSON object whose "trivia" key is an array holding one string per topic, in the same order.'
+    )
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.5,
+            response_format={"type": "json_object"},
+        )
+        trivia = json.loads(response.choices[0].message.content)["trivia"]
+    except Exception as e:
+        print(f"An error occurred while prefetching trivia: {e}")
+        return
+
+    store_trivia(cache, {topic: text for topic, text in zip(topics, trivia) if isinstance(text, str) and text})
+
 # Function to display the carousel of topics
 def display_carousel():
     st.title("Kvizzing Topics Carousel")
-    if 'topics' not in st.session_state:
-        st.session_state.topics = load_topics_from_s3(bucket_name, s3_file_key)
+    # Load the topics once per session rather than on every rerun. A failed load returns no
+    # topics and isn't kept, so the next rerun tries again
+    topics = st.session_state.get('topics')
+    if not topics:
+        topics = fetch_topics(bucket_name, s3_file_key)
+        if topics:
+            st.session_state.topics = topics
+        else:
+            st.warning("Couldn't load the Kvizzing topics right now. Enter a topic below, or try again in a moment.")
     
-    topics = st.session_state.topics
-    selected_topic = topics[random.randint(0, len(topics) - 1)]
+    # Prefer topics whose trivia was prefetched, falling back to a fresh random pick
+    upcoming_topics = st.session_state.setdefault('upcoming_topics', [])
+    selected_topic = upcoming_topics[-1] if upcoming_topics else (random.choice(topics) if topics else None)
 
     # Add an input text box for the user to input a topic
     user_topic = st.text_input("Enter a topic (optional):")
@@ -139,11 +267,28 @@ def display_carousel():
         st.session_state.messages = []
         if user_topic:
             selected_topic = user_topic  # Override the random generation if user input is provided
+        elif upcoming_topics:
+            upcoming_topics.pop()
+            # Wait for the batch holding this topic rather than asking for it a second time
+            batch = st.session_state.get('trivia_batch')
+            if batch is not None and not batch.done():
+                with st.spinner("Fetching trivia..."):
+                    batch.result()
+        if selected_topic is None:
+            st.info("Enter a topic to generate trivia.")
+            return
         st.header(f"{selected_topic}")
         trivia = fetch_trivia(selected_topic)
         
         st.session_state.last_trivia = trivia  # Store the trivia in session state
 
+        # Once the queue runs dry, fetch the next few random topics in the background
+        if not upcoming_topics and topics:
+            upcoming_topics.extend(random.sample(topics, min(TRIVIA_BATCH_SIZE, len(topics))))
+            st.session_state.trivia_batch = get_prewarm_executor().submit(
+                fetch_trivia_batch, list(upcoming_topics), get_openai_client(), get_trivia_cache()
+            )
+
 # Function to display the chat interface
 def display_chat_interface():
 
@@ -152,8 +297,8 @@ def display_chat_interface():
 
     # Display chat messages
     for msg in st.session_state.messages:  # Skip the first message which is the system prompt
-        if msg['role'] != 'user':
-            st.markdown(f"**Response:** \n {msg['content']}")
+        if msg['role'] != 'user' and not any(msg is streamed for streamed in _streamed_messages):
+            st.markdown(f"{_RESPONSE_PREFIX}{msg['content']}")
     
 
     # User input for chat
@@ -43,13 +43,37 @@ import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 import streamlit as st
-from utility.expenses_base import fetch_only_expenses, fetch_default_expenses, format_in_indian_system
+from utility.expenses_base import fetch_filtered_expenses, format_in_indian_system
 import pandas as pd
+import numpy as np
 import streamlit.components.v1 as components
 
 from dotenv import load_dotenv
 load_dotenv()
 
+RUNWAY_TABLE_HEADER = """
+<table style="width:100%; border-collapse: collapse;">
+    <thead>
+        <tr style="background-color: #f2f2f2;">
+            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Liquidation Percentage</th>
+            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Runway (months)</th>
+            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Runway (years)</th>
+        </tr>
+    </thead>
+    <tbody>
+"""
+RUNWAY_TABLE_ROW = """
+        <tr>
+            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{percentage}%</td>
+            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{months:.2f}</td>
+            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{years:.2f}</td>
+        </tr>
+    """
+RUNWAY_TABLE_FOOTER = """
+    </tbody>
+</table>
+"""
+
 # Streamlit UI
 st.title("Expense Dashboard")
 
@@ -58,28 +82,20 @@ with st.form("Expense Type"):
     home_loan_option = st.checkbox("Include Home Loan", value=True)
     submit_button = st.form_submit_button("Submit")
 
-df = fetch_only_expenses()
-
-if submit_button:
-    if expense_type == "All":
-        df = fetch_only_expenses()
-    elif expense_type == "Default Expenses":
-        df = fetch_default_expenses()
-
-    if not home_loan_option:
-        df = df[df['Expense_3'] != 'Loan']
+# Form widgets keep their submitted values across reruns, so this is a cache hit after the first load
+df = fetch_filtered_expenses(expense_type, home_loan_option)
 
 # Runway Calculation Section
 st.header("Runway")
 # Calculate month-on-month expenses using a weighted moving average
-df['Month'] = df['Date'].dt.to_period('M')
-month_category_expenses = df.groupby(['Month', 'Expense_2'] )['Amount'].sum().reset_index()
+month_category_expenses = df.groupby(['Month', 'Expense_2'], observed=True)['Amount'].sum().reset_index()
 month_category_expenses['Month'] = month_category_expenses['Month'].astype(str)  # Convert Period to string
 
 month_expenses = month_category_expenses.groupby('Month')['Amount'].sum().reset_index()
-month_expenses['Weighted_Moving_Avg'] = month_expenses['Amount'].rolling(window=3, min_periods=1).apply(
-    lambda x: (x * [0.1, 0.3, 0.6][-len(x):]).sum(), raw=True
-)
+# Weights are oldest to newest; the first months only get the trailing weights, as with rolling(min_periods=1)
+weights = np.array([0.1, 0.3, 0.6])
+amounts = month_expenses['Amount'].to_numpy(dtype=np.float64)
+month_expenses['Weighted_Moving_Avg'] = np.convolve(amounts, weights[::-1])[:len(amounts)]
 # Calculate average burn per month
 current_burn = month_expenses['Weighted_Moving_Avg'].iloc[-1]
 
@@ -88,38 +104,17 @@ net_worth = st.slider("Enter your current net worth (₹)", min_value=0, max_val
 formatted_net_worth = format_in_indian_system(net_worth)
 
 # Calculate runway for different liquidation percentages
-liquidation_percentages = [1, 0.5, 0.25, 0.1]
-runway_metrics = {}
-
-for percentage in liquidation_percentages:
-    liquidated_amount = net_worth * percentage
-    runway_metrics[percentage] = liquidated_amount / current_burn
+liquidation_percentages = np.array([1, 0.5, 0.25, 0.1])
+runways = net_worth * liquidation_percentages / current_burn
+# One row per tier: percentage, runway in months, runway in years
+runway_metrics = np.stack([liquidation_percentages * 100, runways, runways / 12], axis=1)
 
 # Create a table to display the runway metrics
-runway_table = """
-<table style="width:100%; border-collapse: collapse;">
-    <thead>
-        <tr style="background-color: #f2f2f2;">
-            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Liquidation Percentage</th>
-            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Runway (months)</th>
-            <th style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd;">Runway (years)</th>
-        </tr>
-    </thead>
-    <tbody>
-"""
-for percentage, runway in runway_metrics.items():
-    runway_table += f"""
-        <tr>
-            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{int(percentage * 100)}%</td>
-            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{runway:.2f}</td>
-            <td style="padding: 8px; text-align: left; border-bottom: 1px solid #ddd; color: #ff5733;">{runway / 12:.2f}</td>
-        </tr>
-    """
-
-runway_table += """
-    </tbody>
-</table>
-"""
+runway_rows = [
+    RUNWAY_TABLE_ROW.format(percentage=int(percentage), months=months, years=years)
+    for percentage, months, years in runway_metrics
+]
+runway_table = RUNWAY_TABLE_HEADER + "".join(runway_rows) + RUNWAY_TABLE_FOOTER
 
 # Render the table using Streamlit's HTML component
 components.html(runway_table, height=300, scrolling=True)
@@ -131,7 +126,7 @@ st.metric(label="Current Burn (₹)", value=format_in_indian_system(current_burn
 import plotly.graph_objects as go
 
 # Prepare data for Plotly
-runway_months = list(runway_metrics.values())
+runway_months = runways.tolist()
 
 # Assuming `monthly_expenses` is a DataFrame with columns 'Month' and 'Amount'
 import plotly.express as px
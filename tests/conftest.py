@@ -0,0 +1,5 @@
+import os
+
+# utility.time_block_parsing builds its notes path at import, so give it one
+os.environ.setdefault('OBSIDIAN_BASE_PATH', '.')
+os.environ.setdefault('OBSIDIAN_DAILY_NOTES_PATH', 'notes')
@@ -0,0 +1,141 @@
+import pytest
+
+from components import base_database_manager
+from components.base_database_manager import BaseDatabaseManager, _positional_placeholders
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        if self.connection.fail_on and sql.startswith(self.connection.fail_on):
+            raise RuntimeError("statement failed")
+        self.connection.statements.append(sql)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Records the statements run on it and the autocommit flag they ran under."""
+
+    def __init__(self):
+        self.statements = []
+        self.autocommit = False
+        self.autocommit_seen = []
+        self.fail_on = None
+
+    def cursor(self, name=None, cursor_factory=None):
+        self.autocommit_seen.append(self.autocommit)
+        return FakeCursor(self)
+
+    def set_session(self, **kwargs):
+        raise AssertionError("set_session costs a round trip per checkout")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, min_conn, max_conn, **kwargs):
+        self.min_conn, self.max_conn = min_conn, max_conn
+        self.connections = []
+        self.next = None
+
+    def getconn(self):
+        conn = self.next or FakeConnection()
+        if conn not in self.connections:
+            self.connections.append(conn)
+        return conn
+
+    def putconn(self, conn):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(base_database_manager.pool, 'ThreadedConnectionPool', FakePool)
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://test')
+    return BaseDatabaseManager()
+
+
+def test_default_pool_size(manager):
+    assert (manager.pool.min_conn, manager.pool.max_conn) == (1, 10)
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT 1", "SELECT 1"),
+    ("SELECT * FROM t WHERE a >= %s AND b <= %s", "SELECT * FROM t WHERE a >= $1 AND b <= $2"),
+    ("SELECT date_trunc('week', d) FROM t WHERE d = %s", "SELECT date_trunc('week', d) FROM t WHERE d = $1"),
+    ("SELECT 'it''s' WHERE x = %s", "SELECT 'it''s' WHERE x = $1"),
+])
+def test_positional_placeholders(sql, expected):
+    assert _positional_placeholders(sql) == expected
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 100 %% 7 WHERE x = %s",
+    "SELECT * FROM t WHERE a LIKE '%s' AND b = %s",
+    "SELECT * FROM t WHERE a LIKE 'a%'",
+    "SELECT * FROM t WHERE a = %(a)s",
+])
+def test_unsupported_percent_signs_fail_fast(manager, sql):
+    with pytest.raises(ValueError):
+        with manager.execute(sql, [1], name='stmt'):
+            pass
+    assert manager.pool.connections == []
+
+
+@pytest.mark.parametrize("name", ["bad name", "x; DROP TABLE t", "stmt\n", ""])
+def test_invalid_statement_names(manager, name):
+    with pytest.raises(ValueError):
+        with manager.execute("SELECT 1", name=name):
+            pass
+
+
+def test_statements_are_prepared_once_per_connection(manager):
+    first = manager.pool.next = FakeConnection()
+    for _ in range(2):
+        with manager.execute("SELECT * FROM t WHERE a = %s", [1], name='by_a'):
+            pass
+    assert first.statements == [
+        "PREPARE by_a AS SELECT * FROM t WHERE a = $1",
+        "EXECUTE by_a (%s)",
+        "EXECUTE by_a (%s)",
+    ]
+
+    # A connection the pool opened later has not seen the statement yet
+    manager.pool.next = FakeConnection()
+    with manager.execute("SELECT * FROM t WHERE a = %s", [2], name='by_a'):
+        pass
+    assert manager.pool.next.statements == ["PREPARE by_a AS SELECT * FROM t WHERE a = $1", "EXECUTE by_a (%s)"]
+
+
+def test_failed_execute_keeps_the_prepared_name(manager):
+    conn = manager.pool.next = FakeConnection()
+    conn.fail_on = "EXECUTE"
+    with pytest.raises(RuntimeError):
+        with manager.execute("SELECT %s", [1], name='echo'):
+            pass
+
+    # The PREPARE survived the rollback, so preparing again would fail with "already exists"
+    conn.fail_on = None
+    with manager.execute("SELECT %s", [1], name='echo'):
+        pass
+    assert conn.statements == ["PREPARE echo AS SELECT $1", "EXECUTE echo (%s)"]
+
+
+def test_readonly_cursors_autocommit_without_session_round_trips(manager):
+    conn = manager.pool.next = FakeConnection()
+    with manager.get_cursor(readonly=True):
+        pass
+    with manager.get_cursor(readonly=True, server_side=True):
+        pass
+    with manager.get_cursor():
+        pass
+    assert conn.autocommit_seen == [True, False, False]
+    assert conn.autocommit is False
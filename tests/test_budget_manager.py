@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from components.budget_manager import BudgetManager, _count_weekdays
+
+
+def reference_count_weekdays(start_date, end_date):
+    """Day-by-day weekday count the closed form replaced."""
+    days = (end_date - start_date).days + 1
+    return sum(1 for offset in range(days) if (start_date + timedelta(days=offset)).weekday() < 5)
+
+
+@pytest.mark.parametrize("start_date", [date(2024, 9, 1) + timedelta(days=offset) for offset in range(7)])
+@pytest.mark.parametrize("length", [0, 1, 4, 5, 6, 7, 8, 13, 14, 30, 365])
+def test_count_weekdays_matches_day_by_day_count(start_date, length):
+    end_date = start_date + timedelta(days=length)
+    assert _count_weekdays(start_date.toordinal(), end_date.toordinal()) == reference_count_weekdays(start_date, end_date)
+
+
+BUDGETS_YAML = """
+budgets:
+  - name: "Late"
+    target: 10
+    unit: "hours"
+    direction: "greater"
+    start_date: "2024-09-10"
+    end_date: "2024-09-30"
+  - name: "Early"
+    target: 20
+    unit: "hours"
+    direction: "less"
+    start_date: 2024-09-01
+    end_date: 2024-09-15
+    include_weekends: false
+"""
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config_path = tmp_path / "time-goals.yaml"
+    config_path.write_text(BUDGETS_YAML)
+    return BudgetManager(str(config_path), autosave=False)
+
+
+@pytest.mark.parametrize("day, expected", [
+    (date(2024, 8, 31), []),
+    (date(2024, 9, 1), ["Early"]),
+    (date(2024, 9, 10), ["Late", "Early"]),
+    (date(2024, 9, 15), ["Late", "Early"]),
+    (date(2024, 9, 16), ["Late"]),
+    (date(2024, 10, 1), []),
+])
+def test_active_budgets_keep_config_order(manager, day, expected):
+    assert [budget['name'] for budget in manager.get_active_budgets(day)] == expected
+
+
+def test_active_budgets_follow_updates(manager):
+    manager.update_budget("Late", {'start_date': "2024-08-01"})
+    assert [budget['name'] for budget in manager.get_active_budgets(date(2024, 8, 15))] == ["Late"]
+
+
+def test_weekday_progress_counts_only_weekdays(manager):
+    progress = manager.calculate_progress("Early", 10, date(2024, 9, 8))
+    total = reference_count_weekdays(date(2024, 9, 1), date(2024, 9, 15))
+    passed = reference_count_weekdays(date(2024, 9, 1), date(2024, 9, 8))
+    assert progress['expected'] == pytest.approx(20 / total * passed)
+
+
+def test_batch_saves_once_and_atomically(tmp_path, monkeypatch):
+    config_path = tmp_path / "time-goals.yaml"
+    config_path.write_text(BUDGETS_YAML)
+    manager = BudgetManager(str(config_path))
+    saves = []
+    save_budgets = manager.save_budgets
+    monkeypatch.setattr(manager, 'save_budgets', lambda: saves.append(1) or save_budgets())
+
+    with manager.batch():
+        manager.update_budget("Late", {'target': 12})
+        manager.add_budget({'name': "New", 'target': 1, 'unit': "hours", 'direction': "greater",
+                            'start_date': "2024-09-01", 'end_date': "2024-09-30"})
+    # Nothing changed, so nothing is written
+    with manager.batch():
+        manager.update_budget("Missing", {'target': 3})
+
+    assert saves == [1]
+    assert not (tmp_path / "time-goals.yaml.tmp").exists()
+    reloaded = BudgetManager(str(config_path), autosave=False)
+    assert [budget['name'] for budget in reloaded.get_all_budgets()] == ["Late", "Early", "New"]
+    assert reloaded.get_budget("Late")['target'] == 12
+    assert [budget['name'] for budget in reloaded.get_active_budgets(date(2024, 9, 20))] == ["Late", "New"]
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.datatable_callout import CalloutSystem, _rolling_mean_std
+
+
+def reference_format_number(value):
+    """The original per-value formatter that format_number_array() replaced."""
+    if value >= 1_000_000:
+        return f'{value / 1_000_000:.1f}M'
+    elif value >= 1_000:
+        return f'{value / 1_000:.1f}K'
+    elif value >= 1:
+        return f'{value:.0f}'
+    else:
+        return f'{value:.2f}'
+
+
+def reference_rolling_stats(df, target_column, window=7):
+    """The original groupby-rolling computation, aligned back onto the rows by index."""
+    group = df.groupby('KEY')[target_column]
+    avg = group.rolling(window, min_periods=1).mean().reset_index(0, drop=True)
+    std_dev = group.rolling(window, min_periods=1).std().reset_index(0, drop=True)
+    return avg.reindex(df.index), std_dev.reindex(df.index)
+
+
+def reference_threshold_callouts(df, target_column, direction, threshold):
+    """The original row-by-row spike/drop check."""
+    label = target_column.replace('_', ' ').lower()
+    operator = '>' if direction == 'above' else '<'
+    callouts = []
+    for _, row in df.iterrows():
+        value = row[target_column]
+        avg = row[f'{target_column}_7_day_avg']
+        std = row[f'{target_column}_7_day_std_dev']
+        bound = avg + threshold * std if direction == 'above' else avg - threshold * std
+        if (value > bound) if direction == 'above' else (value < bound):
+            callouts.append({
+                'key': row['KEY'],
+                'date': row['DATE'],
+                'check': f"{'Spike' if direction == 'above' else 'Drop'} in {label}",
+                'condition': f"{operator} {threshold} standard deviation from L7 average {label}",
+                'more_info': f"{reference_format_number(value)} {operator} {reference_format_number(bound)} "
+                             f"(L7 avg: {reference_format_number(avg)}, L7 std dev: {reference_format_number(std)})",
+                'value': str(value),
+                'std_devs_away': round((value - avg) / std, 2),
+            })
+    return callouts
+
+
+def make_frame(seed=0, rows=120):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'KEY': rng.choice(['Food', 'Rent', 'Travel'], size=rows).astype(object),
+        'DATE': pd.date_range('2024-01-01', periods=rows, freq='D'),
+        'AMOUNT': rng.gamma(2.0, 500.0, size=rows),
+    })
+    # Occasional spikes and drops, missing values and a row without a key
+    df.loc[rng.choice(rows, size=6, replace=False), 'AMOUNT'] *= 20
+    df.loc[rng.choice(rows, size=6, replace=False), 'AMOUNT'] = 0.5
+    df.loc[[3, 40], 'AMOUNT'] = np.nan
+    df.loc[7, 'KEY'] = None
+    return df
+
+
+ENGINES = [('pandas', False), ('polars', False), ('pandas', True)]
+
+
+@pytest.mark.parametrize("engine, online", ENGINES)
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_rolling_stats_match_reference(engine, online, window):
+    df = make_frame()
+    expected_avg, expected_std = reference_rolling_stats(df.copy(), 'AMOUNT', window)
+
+    cs = CalloutSystem(df, engine=engine)
+    cs.calculate_rolling_stats('AMOUNT', window, online=online)
+
+    np.testing.assert_allclose(df['AMOUNT_7_day_avg'].to_numpy(dtype=float), expected_avg.to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(df['AMOUNT_7_day_std_dev'].to_numpy(dtype=float), expected_std.to_numpy(dtype=float), rtol=1e-7, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 4, 5])
+def test_rolling_mean_std_kernel(window):
+    values = np.array([1.0, 4.0, np.nan, 2.0, 8.0, 5.0, 3.0, np.nan, np.nan, 7.0, 6.0, 1.0])
+    group_bounds = np.array([0, 5, 5, len(values)])  # includes an empty group
+    out_mean = np.empty(len(values))
+    out_std = np.empty(len(values))
+    _rolling_mean_std(values, group_bounds, window, out_mean, out_std)
+
+    expected_mean, expected_std = [], []
+    for start, end in zip(group_bounds[:-1], group_bounds[1:]):
+        rolling = pd.Series(values[start:end]).rolling(window, min_periods=1)
+        expected_mean.extend(rolling.mean())
+        expected_std.extend(rolling.std())
+    np.testing.assert_allclose(out_mean, expected_mean, equal_nan=True)
+    np.testing.assert_allclose(out_std, expected_std, equal_nan=True, atol=1e-12)
+
+
+def test_format_number_array_matches_reference():
+    values = np.array([0, 0.004, 0.5, 0.999, 1, 1.5, 2.5, 999.4, 999.5, 1_000, 1_049.99, 999_949,
+                       999_950, 1_000_000, 12_345_678, -5, -1_500, np.nan, np.inf])
+    expected = [reference_format_number(value) for value in values]
+    assert CalloutSystem.format_number_array(values).tolist() == expected
+    assert [CalloutSystem.format_number(value) for value in values] == expected
+
+
+@pytest.mark.parametrize("engine, online", ENGINES)
+@pytest.mark.parametrize("direction", ['above', 'below'])
+def test_spike_and_drop_callouts_match_reference(engine, online, direction):
+    df = make_frame(seed=1)
+    cs = CalloutSystem(df, engine=engine)
+    cs.calculate_rolling_stats('AMOUNT', online=online)
+    if direction == 'above':
+        cs.check_spike_in_column('AMOUNT', threshold=1)
+    else:
+        cs.check_drop_in_column('AMOUNT', threshold=1)
+    cs._materialize()
+
+    expected = reference_threshold_callouts(df, 'AMOUNT', direction, 1)
+    actual = cs.callouts_df.to_dict('records')
+    assert expected, "the fixture should trigger some callouts"
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got['key'] == want['key']
+        assert pd.Timestamp(got['date']) == want['date']
+        for column in ['check', 'condition', 'more_info', 'value']:
+            assert got[column] == want[column]
+        assert np.isclose(got['std_devs_away'], want['std_devs_away'])
+
+
+@pytest.mark.parametrize("condition", ['>', '<'])
+def test_condition_callouts_match_reference(condition):
+    df = make_frame(seed=2)
+    threshold = 1_500.0
+    cs = CalloutSystem(df)
+    cs.check_condition_in_column('AMOUNT', condition, threshold)
+    cs._materialize()
+
+    rows = df[df['AMOUNT'] > threshold] if condition == '>' else df[df['AMOUNT'] < threshold]
+    actual = cs.callouts_df
+    assert actual['key'].tolist() == rows['KEY'].tolist()
+    assert (actual['check'] == f"amount {condition} {reference_format_number(threshold)}").all()
+    assert (actual['condition'] == actual['check']).all()
+    assert actual['more_info'].tolist() == [f"Current value: {reference_format_number(v)}" for v in rows['AMOUNT']]
+    assert actual['value'].tolist() == [str(v) for v in rows['AMOUNT']]
+    assert actual['std_devs_away'].isna().all()
+
+
+def test_invalid_arguments_raise():
+    df = make_frame()
+    with pytest.raises(ValueError):
+        CalloutSystem(df, engine='spark')
+    with pytest.raises(ValueError):
+        CalloutSystem(df).check_condition_in_column('AMOUNT', '>=', 1)
@@ -0,0 +1,121 @@
+import csv
+import io
+import re
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from utility.expense_parsing import LEDGER_COLUMNS, parse_ledger_to_df, write_to_csv, write_to_parquet
+
+
+def reference_parse_ledger_file(content):
+    """The original block-by-block, line-by-line parser that parse_ledger_to_df() replaced."""
+    result = []
+    start_parsing = False
+    for block in content.strip().split('\n\n'):
+        lines = block.split('\n')
+        if any("Starting Balances" in line for line in lines):
+            continue
+        if any(re.match(r'\d{4}/\d{2}/\d{2}', line) for line in lines):
+            start_parsing = True
+        if not start_parsing:
+            continue
+        match = re.match(r'(\d{4}/\d{2}/\d{2})\s+(.+)', lines[0].strip())
+        if not match:
+            continue
+        date_str, description = match.groups()
+        date = datetime.strptime(date_str, '%Y/%m/%d').strftime('%Y-%m-%d')
+        for line in lines[1:]:
+            account_match = re.match(r'([\w:]+)\s+₹([\d.,]+)', line.strip())
+            if account_match:
+                account, amount = account_match.groups()
+                account_parts = account.split(':')
+                while len(account_parts) < 3:
+                    account_parts.append('')
+                expense_1, expense_2, expense_3 = account_parts
+                result.append([date, description, float(amount.replace(',', '')), expense_1, expense_2, expense_3])
+    return result
+
+
+LEDGER = """\
+; Ledger for tests
+
+2024/01/01 * Starting Balances
+    Assets:Bank:HDFC  ₹1,00,000.00
+    Equity:Opening
+
+just a note
+without a date
+
+; stray comment first
+2024/01/02 Hidden behind a comment
+    Expenses:Food  ₹10
+
+2024/01/03 * Swiggy & co  
+    Expenses:Food:Delivery    ₹1,234.50
+    Expenses:Tips  ₹20
+    not a posting
+    Assets:Bank:HDFC
+
+2024/02/10 Rent
+    Expenses:Home:Rent  ₹25,000
+    Assets:Bank
+
+2024/02/11 Home loan
+    Expenses:Home:Loan  ₹50,000.00
+    Assets:Bank:HDFC  ₹0.5
+"""
+
+
+def test_parse_ledger_matches_reference():
+    parsed = parse_ledger_to_df(LEDGER)
+    assert list(parsed.columns) == LEDGER_COLUMNS
+    assert parsed.values.tolist() == reference_parse_ledger_file(LEDGER)
+
+
+def test_written_csv_matches_reference(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(LEDGER_COLUMNS)
+    writer.writerows(reference_parse_ledger_file(LEDGER))
+
+    assert write_to_csv(parse_ledger_to_df(LEDGER), 'files/ledger_output.csv')
+    with open('files/ledger_output.csv', newline='') as file:
+        assert file.read() == buffer.getvalue()
+    # Unchanged content leaves the file alone
+    assert not write_to_csv(parse_ledger_to_df(LEDGER), 'files/ledger_output.csv')
+
+
+def test_deep_accounts_keep_the_remainder_in_expense_3():
+    parsed = parse_ledger_to_df("2024/03/01 Deep\n    Expenses:Home:Rent:Deposit  ₹5\n")
+    assert parsed[['Expense_1', 'Expense_2', 'Expense_3']].values.tolist() == [['Expenses', 'Home', 'Rent:Deposit']]
+    # The old parser couldn't unpack more than three levels
+    with pytest.raises(ValueError):
+        reference_parse_ledger_file("2024/03/01 Deep\n    Expenses:Home:Rent:Deposit  ₹5\n")
+
+
+@pytest.mark.parametrize("content", ["", "no transactions here", "2024/03/01 No postings\n    Assets:Bank\n"])
+def test_ledgers_without_postings(tmp_path, content):
+    parsed = parse_ledger_to_df(content)
+    assert parsed.empty and list(parsed.columns) == LEDGER_COLUMNS
+    for column in ['Expense_1', 'Expense_2', 'Expense_3']:
+        assert not pd.api.types.is_float_dtype(parsed[column])
+    write_to_parquet(parsed, tmp_path / "ledger.parquet")
+    assert pd.read_parquet(tmp_path / "ledger.parquet").empty
+
+
+def test_parquet_copy_is_typed(tmp_path):
+    write_to_parquet(parse_ledger_to_df(LEDGER), tmp_path / "ledger.parquet")
+    stored = pd.read_parquet(tmp_path / "ledger.parquet")
+    expected = pd.DataFrame(reference_parse_ledger_file(LEDGER), columns=LEDGER_COLUMNS)
+
+    assert pd.api.types.is_datetime64_any_dtype(stored['Date'])
+    assert stored['Date'].dt.strftime('%Y-%m-%d').tolist() == expected['Date'].tolist()
+    assert stored['Amount'].dtype == 'float32'
+    assert stored['Amount'].tolist() == pytest.approx(expected['Amount'].tolist())
+    # Missing account levels are stored as nulls, as the CSV reader produced them
+    for column in ['Description', 'Expense_1', 'Expense_2', 'Expense_3']:
+        assert isinstance(stored[column].dtype, pd.CategoricalDtype)
+        assert stored[column].astype(object).where(stored[column].notna(), '').tolist() == expected[column].tolist()
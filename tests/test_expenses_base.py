@@ -0,0 +1,109 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utility import expense_parsing, expenses_base
+
+LEDGER = """\
+2024/01/01 * Starting Balances
+    Assets:Bank  ₹1,000
+
+2024/01/02 Groceries
+    Expenses:Food:Groceries  ₹1,250.75
+    Assets:Bank
+
+2024/01/20 Bank fee
+    Expenses:Banking  ₹10
+
+2024/02/05 Home loan
+    Expenses:Home:Loan  ₹50,000
+
+2024/03/09 Salary
+    Income:Salary  ₹90,000
+    Assets:Bank  ₹90,000
+"""
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(expense_parsing, 'fetch_ledger_from_s3', lambda bucket_name, object_key, etag=None: (LEDGER, '"v1"'))
+    expenses_base.load_data.clear()
+    yield
+    expenses_base.load_data.clear()
+
+
+def reference_load_data():
+    """The original load_data(): read the CSV with pandas and normalize it."""
+    df = pd.read_csv(expenses_base.LEDGER_PARQUET.replace('.parquet', '.csv'), parse_dates=['Date'])
+    df['Amount'] = pd.to_numeric(df['Amount'].astype(str).str.replace(r'[₹,]', '', regex=True), errors='coerce')
+    df.loc[(df['Expense_2'] == 'Home') & (df['Expense_3'] == 'Loan'), 'Amount'] /= 2
+    return df
+
+
+def test_cache_round_trip_returns_the_same_ledger(ledger):
+    built = expenses_base.load_data()
+    expenses_base.load_data.clear()
+    cached = expenses_base.read_cached_ledger()
+
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached.reset_index(drop=True), built.reset_index(drop=True))
+
+
+def test_load_data_matches_reference(ledger):
+    df = expenses_base.load_data()
+    expected = reference_load_data()
+
+    assert df['Date'].tolist() == expected['Date'].tolist()
+    np.testing.assert_allclose(df['Amount'].to_numpy(dtype=float), expected['Amount'].to_numpy(), rtol=1e-6)
+    for column in ['Description', 'Expense_1', 'Expense_2', 'Expense_3']:
+        assert df[column].astype(object).where(df[column].notna(), None).tolist() == expected[column].astype(object).where(expected[column].notna(), None).tolist()
+    assert (df['DateGroup'] == df['Date'].dt.normalize()).all()
+
+
+def test_cache_is_rebuilt_when_the_ledger_changes(ledger, monkeypatch):
+    expenses_base.load_data()
+    changed = LEDGER + "\n2024/04/01 Books\n    Expenses:Books  ₹300\n"
+    monkeypatch.setattr(expense_parsing, 'fetch_ledger_from_s3', lambda bucket_name, object_key, etag=None: (changed, '"v2"'))
+    expenses_base.load_data.clear()
+
+    assert 'Books' in expenses_base.load_data()['Description'].astype(str).tolist()
+
+
+def test_expenses_only_matches_filtering_the_full_ledger(ledger):
+    full = expenses_base.load_data()
+    expected = expenses_base.only_expenses(full).reset_index(drop=True)
+    # Once from the freshly built ledger and once through the Arrow filter on the cached dataset
+    for _ in range(2):
+        expenses_base.load_data.clear()
+        actual = expenses_base.load_data(expenses_only=True).reset_index(drop=True)
+        assert actual[['Date', 'Amount']].equals(expected[['Date', 'Amount']])
+        assert actual['Expense_2'].astype(object).tolist() == expected['Expense_2'].astype(object).tolist()
+
+
+def test_concurrent_rebuilds_swap_in_complete_datasets(ledger):
+    built = expenses_base.load_data()
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def rebuild():
+        barrier.wait()
+        try:
+            expenses_base.write_cached_ledger(built)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=rebuild) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    pd.testing.assert_frame_equal(expenses_base.read_cached_ledger().reset_index(drop=True), built.reset_index(drop=True))
+    # No staging directories or metadata files are left behind
+    assert sorted(os.listdir('files')) == ['ledger_output', 'ledger_output.csv', 'ledger_output.etag',
+                                           'ledger_output.json', 'ledger_output.parquet']
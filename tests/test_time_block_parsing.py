@@ -0,0 +1,86 @@
+import re
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from utility.time_block_parsing import _minutes_since_midnight, parse_time_blocks, process_files
+
+
+def reference_parse_time_blocks(file_path, file_date):
+    """The original text-mode parser that parse_time_blocks() replaced."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+
+    parsed_blocks = []
+    for start_time, end_time, activity in re.findall(r'- \[x\] (\d{2}:\d{2}) - (\d{2}:\d{2})(?:[:\s]*)(.+?)(?:\s✅.*)?$', content, re.MULTILINE):
+        start_datetime = datetime.combine(file_date, datetime.strptime(start_time, "%H:%M").time())
+        end_datetime = datetime.combine(file_date, datetime.strptime(end_time, "%H:%M").time())
+        duration = end_datetime - start_datetime
+        if duration.total_seconds() < 0:
+            end_datetime += timedelta(days=1)
+            duration = end_datetime - start_datetime
+        parsed_blocks.append((start_datetime, end_datetime, duration, activity.strip()))
+    return parsed_blocks
+
+
+NOTE_LINES = [
+    "# Daily note",
+    "- [x] 07:00 - 07:30 Breakfast ✅ 2024-07-01",
+    "- [x] 09:00 - 10:30: Deep work on the ledger",
+    "- [ ] 11:00 - 12:00 Not done yet",
+    "- [x] 12:00 - 12:00 Zero length",
+    "- [x] 13:05 - 14:00   Café catchup ✅ 2024-07-01",
+    "- [x] 23:30 - 00:45 Movie past midnight",
+    "- [x] 00:00 - 23:59 Whole day",
+    "Some prose with - [x] 10:00 - 11:00 inline mention",
+]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_parse_time_blocks_matches_reference(tmp_path, newline):
+    note = tmp_path / "2024-07-01.md"
+    note.write_bytes(newline.join(NOTE_LINES).encode('utf-8') + newline.encode())
+    file_date = date(2024, 7, 1)
+
+    assert parse_time_blocks(str(note), np.datetime64(file_date)) == reference_parse_time_blocks(str(note), file_date)
+
+
+def test_parse_time_blocks_wraps_past_midnight(tmp_path):
+    note = tmp_path / "2024-07-01.md"
+    note.write_text("- [x] 23:30 - 00:45 Movie\n", encoding='utf-8')
+
+    [(start, end, duration, activity)] = parse_time_blocks(str(note), np.datetime64(date(2024, 7, 1)))
+    assert (start, end, duration, activity) == (
+        datetime(2024, 7, 1, 23, 30), datetime(2024, 7, 2, 0, 45), timedelta(minutes=75), "Movie"
+    )
+
+
+def test_parse_time_blocks_without_checked_tasks(tmp_path):
+    note = tmp_path / "2024-07-01.md"
+    note.write_text("- [ ] 09:00 - 10:00 Planned\n", encoding='utf-8')
+    assert parse_time_blocks(str(note), np.datetime64(date(2024, 7, 1))) == []
+
+
+def test_minutes_since_midnight():
+    times = [b"00:00", b"09:05", b"12:30", b"23:59"]
+    expected = [int(time[:2]) * 60 + int(time[3:]) for time in times]
+    assert _minutes_since_midnight(times).tolist() == expected
+
+
+@pytest.mark.parametrize("time", [b"24:00", b"12:60"])
+def test_minutes_since_midnight_rejects_invalid_times(time):
+    with pytest.raises(ValueError):
+        _minutes_since_midnight([b"09:00", time])
+
+
+def test_process_files_reads_the_notes_folder(tmp_path):
+    today = date.today()
+    (tmp_path / f"{today:%Y-%m-%d}.md").write_text("- [x] 09:00 - 10:30 Deep work\n", encoding='utf-8')
+    (tmp_path / "not-a-note.md").write_text("- [x] 11:00 - 12:00 Ignored\n", encoding='utf-8')
+
+    assert process_files(str(tmp_path)) == [[f"{today:%Y-%m-%d}", "09:00", "10:30", "1:30:00", "Deep work"]]
+
+
+def test_process_files_without_a_notes_folder(tmp_path):
+    assert process_files(str(tmp_path / "missing")) == []
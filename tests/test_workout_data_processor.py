@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+from components.workout_data_processor import WorkoutDataProcessor
+from components.workout_database_manager import WorkoutDatabaseManager
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def execute(self, sql, params=None):
+        self.db.inserted.append(params)
+
+    def fetchone(self):
+        return {'workout_id': len(self.db.inserted)}
+
+
+class FakeWorkoutDatabase(WorkoutDatabaseManager):
+    """WorkoutDatabaseManager without a connection pool, counting the queries it serves."""
+
+    def __init__(self):
+        self.calls = 0
+        self.inserted = []
+        self.rows = [
+            {'date': '2024-01-01', 'exercise_name': 'bench press', 'muscle_group': 'Chest', 'weight_kg': 60.0, 'reps': 8, 'set_number': 1},
+            {'date': '2024-01-03', 'exercise_name': 'squats', 'muscle_group': 'Legs', 'weight_kg': 80.0, 'reps': 5, 'set_number': 1},
+        ]
+
+    def get_workouts_fast(self, start_date=None, end_date=None):
+        self.calls += 1
+        return pd.DataFrame(self.rows)
+
+    @contextmanager
+    def get_cursor(self, **kwargs):
+        yield FakeCursor(self)
+
+
+@pytest.fixture
+def processor(tmp_path):
+    WorkoutDatabaseManager.invalidate_cache()
+    yield WorkoutDataProcessor(FakeWorkoutDatabase(), mapping_path=str(tmp_path / "mapping.json"))
+    WorkoutDatabaseManager.invalidate_cache()
+
+
+def test_workouts_are_cached(processor):
+    first = processor.get_workouts('2024-01-01', '2024-01-31')
+    first['volume'] = 0  # Callers get a copy
+    second = processor.get_workouts('2024-01-01', '2024-01-31')
+
+    assert processor.db_manager.calls == 1
+    assert second['volume'].tolist() == [480.0, 400.0]
+    assert second['exercise_name'].astype(str).tolist() == ['Bench press', 'Back squat']
+
+
+def test_adding_a_workout_refetches_workouts(processor):
+    processor.get_workouts('2024-01-01', '2024-01-31')
+    processor.db_manager.rows.append(
+        {'date': '2024-01-05', 'exercise_name': 'deadlift', 'muscle_group': 'Back', 'weight_kg': 100.0, 'reps': 3, 'set_number': 1})
+    assert len(processor.get_workouts('2024-01-01', '2024-01-31')) == 2
+
+    processor.db_manager.add_workout({'date': '2024-01-05', 'muscle_group': 'Back', 'exercises': []})
+    workouts = processor.get_workouts('2024-01-01', '2024-01-31')
+
+    assert processor.db_manager.calls == 2
+    assert len(workouts) == 3
+    assert workouts['exercise_name'].astype(str).tolist()[-1] == 'Deadlift'
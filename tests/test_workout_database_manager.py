@@ -0,0 +1,114 @@
+import io
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+import pytest
+
+from components.workout_database_manager import WorkoutDatabaseManager, read_workouts_csv
+
+# What COPY (...) TO STDOUT WITH (FORMAT CSV, HEADER) writes: NULL unquoted, empty strings quoted
+COPY_OUTPUT = b"""date,muscle_group,exercise_name,set_number,weight_kg,reps,notes
+2024-01-03,Legs,Squat,1,80.00,5,
+2024-01-03,Legs,Squat,2,82.50,5,""
+2024-01-01,Chest,"Bench press, paused",1,60.00,8,push next
+"""
+
+
+def test_copy_csv_keeps_empty_notes_apart_from_nulls():
+    df = read_workouts_csv(io.BytesIO(COPY_OUTPUT))
+
+    assert list(df.columns) == ['date', 'muscle_group', 'exercise_name', 'set_number', 'weight_kg', 'reps', 'notes']
+    assert df['notes'].isna().tolist() == [True, False, False]
+    assert df['notes'].iloc[1:].tolist() == ['', 'push next']
+    assert df['exercise_name'].tolist() == ['Squat', 'Squat', 'Bench press, paused']
+    assert df['weight_kg'].tolist() == [80.0, 82.5, 60.0]
+    assert df['reps'].tolist() == [5, 5, 8]
+
+
+class FailingCopyDatabase(WorkoutDatabaseManager):
+    """WorkoutDatabaseManager whose COPY raises the given error and whose row query returns a marker frame."""
+
+    def __init__(self, error):
+        self.error = error
+
+    @contextmanager
+    def get_cursor(self, **kwargs):
+        raise self.error
+        yield
+
+    def get_workouts(self, start_date=None, end_date=None, stream=False):
+        return pd.DataFrame({'fallback': [True]})
+
+
+@pytest.mark.parametrize("error", [psycopg2.OperationalError("connection lost"), psycopg2.errors.FeatureNotSupported("no COPY")])
+def test_database_errors_fall_back_to_get_workouts(error):
+    assert FailingCopyDatabase(error).get_workouts_fast().columns.tolist() == ['fallback']
+
+
+def test_other_errors_are_not_hidden_by_the_fallback():
+    with pytest.raises(KeyError):
+        FailingCopyDatabase(KeyError('weight_kg')).get_workouts_fast()
+
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+
+class Migrations:
+    """Records migrate_indexes() runs, raising the queued errors first."""
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = []
+
+    def migrate_indexes(self, db_manager):
+        self.runs += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+@pytest.fixture
+def migrations(monkeypatch):
+    from components import base_database_manager, workout_database_manager
+
+    monkeypatch.setattr(base_database_manager.pool, 'ThreadedConnectionPool', lambda *args, **kwargs: None)
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://test')
+    migrations = Migrations()
+    monkeypatch.setattr(WorkoutDatabaseManager, 'migrate_indexes', lambda self: migrations.migrate_indexes(self))
+    workout_database_manager._migrate_indexes.clear()
+    yield migrations
+    workout_database_manager._migrate_indexes.clear()
+
+
+def test_index_migration_runs_once_per_process(migrations):
+    WorkoutDatabaseManager()
+    WorkoutDatabaseManager()
+    assert migrations.runs == 1
+
+
+def test_failed_index_migration_is_retried(migrations):
+    migrations.errors.append(psycopg2.OperationalError("connection lost"))
+    for _ in range(3):
+        WorkoutDatabaseManager()
+    assert migrations.runs == 2
+
+
+def test_setup_tables_only_runs_idempotent_creates(monkeypatch):
+    statements = []
+
+    @contextmanager
+    def get_cursor(self, **kwargs):
+        yield RecordingCursor(statements)
+
+    monkeypatch.setattr(WorkoutDatabaseManager, 'get_cursor', get_cursor)
+    WorkoutDatabaseManager.__new__(WorkoutDatabaseManager).setup_tables()
+
+    [sql] = statements
+    body = "\n".join(line.split('--')[0] for line in sql.splitlines())
+    statements = [statement.strip() for statement in body.split(';') if statement.strip()]
+    assert statements and all(statement.startswith(("CREATE TABLE IF NOT EXISTS", "CREATE INDEX IF NOT EXISTS")) for statement in statements)
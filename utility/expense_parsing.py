@@ -1,9 +1,14 @@
 import re
 import csv
+import io
 import os
-from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 import boto3
+from botocore.exceptions import ClientError
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Load environment variables from .env file
 load_dotenv()
@@ -12,70 +17,73 @@ load_dotenv()
 S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'obsidian-notes-storage')
 S3_OBJECT_KEY = os.getenv('S3_OBJECT_KEY', 'ThoughtDenS3/transactions.ledger')  # Path in your S3 bucket
 
-# Function to fetch the ledger file from S3
-def fetch_ledger_from_s3(bucket_name, object_key):
-    s3_client = boto3.client('s3')
-    response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
+# Ledger patterns, compiled once; anchored because str.extract searches rather than matches
+_DATE_DESC_RE = re.compile(r'^(\d{4}/\d{2}/\d{2})\s+(.+)')
+_ACCOUNT_RE = re.compile(r'^([\w:]+)\s+₹([\d.,]+)')
+
+# Columns of the parsed ledger, in CSV order
+LEDGER_COLUMNS = ['Date', 'Description', 'Amount', 'Expense_1', 'Expense_2', 'Expense_3']
+# Schema of the typed Parquet copy of the ledger. The text columns repeat heavily, so they are
+# dictionary-encoded and load as categoricals, whose codes pandas already narrows to int8/int16
+LEDGER_SCHEMA = pa.schema([
+    ('Date', pa.timestamp('ns')),
+    ('Description', pa.dictionary(pa.int32(), pa.string())),
+    ('Amount', pa.float32()),
+    ('Expense_1', pa.dictionary(pa.int32(), pa.string())),
+    ('Expense_2', pa.dictionary(pa.int32(), pa.string())),
+    ('Expense_3', pa.dictionary(pa.int32(), pa.string())),
+])
+
+# One S3 client per process: building one loads the service model and resolves credentials,
+# which costs more than the conditional GET itself. boto3 clients are thread-safe
+@lru_cache(maxsize=None)
+def _s3_client():
+    return boto3.client('s3')
+
+# Function to fetch the ledger file from S3. Given the ETag of the last download, S3 answers
+# 304 Not Modified instead of resending an unchanged ledger, and None is returned
+def fetch_ledger_from_s3(bucket_name, object_key, etag=None):
+    conditions = {'IfNoneMatch': etag} if etag else {}
+    try:
+        response = _s3_client().get_object(Bucket=bucket_name, Key=object_key, **conditions)
+    except ClientError as e:
+        if e.response['Error']['Code'] == '304':
+            return None, etag
+        raise
     content = response['Body'].read().decode('utf-8')
-    return content
+    return content, response['ETag']
 
-# Function to parse the ledger file content
-def parse_ledger_file(content):
+# Function to parse the ledger file content into a DataFrame of postings
+def parse_ledger_to_df(content):
     # Split the content into blocks based on empty lines (transaction boundaries)
-    blocks = content.strip().split('\n\n')
-
-    result = []
-    start_parsing = False  # Initialize flag for starting to parse after "Starting Balances" section
-
-    for block in blocks:
-        lines = block.split('\n')
-
-        # Skip blocks related to "Starting Balances" section
-        if any("Starting Balances" in line for line in lines):
-            continue
-
-        # Activate parsing after the starting balances section
-        if any(re.match(r'\d{4}/\d{2}/\d{2}', line) for line in lines):
-            start_parsing = True
-
-        if not start_parsing:
-            continue
-
-        # Extract date and description from the first line
-        first_line = lines[0].strip()
-        date_description_match = re.match(r'(\d{4}/\d{2}/\d{2})\s+(.+)', first_line)
-
-        if date_description_match:
-            date_str, description = date_description_match.groups()
-            date = datetime.strptime(date_str, '%Y/%m/%d').strftime('%Y-%m-%d')
-        else:
-            # Skip this block if the date/description line doesn't match
-            continue
-
-        # Extract the transaction details from the remaining lines
-        for line in lines[1:]:
-            # Match accounts and amounts in the format 'Account:SubAccount:SubSubAccount ₹Amount'
-            account_match = re.match(r'([\w:]+)\s+₹([\d.,]+)', line.strip())
-            if account_match:
-                account, amount = account_match.groups()
-
-                # Remove commas from amounts, if present
-                amount = amount.replace(',', '')
-
-                # Split the account string into its parts (Expense_1, Expense_2, Expense_3)
-                account_parts = account.split(':')
-
-                # Ensure there are exactly 3 parts, fill missing parts with empty strings
-                while len(account_parts) < 3:
-                    account_parts.append('')
-
-                # Assign the parts to the respective expense categories
-                expense_1, expense_2, expense_3 = account_parts
-
-                # Add the parsed entry to the result
-                result.append([date, description, float(amount), expense_1, expense_2, expense_3])
-
-    return result
+    blocks = pd.Series(content.strip().split('\n\n'), dtype=object)
+
+    # Skip blocks related to "Starting Balances" section
+    blocks = blocks[~blocks.str.contains("Starting Balances", regex=False)]
+
+    # Extract date and description from the first line; undated blocks aren't transactions
+    lines = blocks.str.partition('\n')
+    headers = lines[0].str.strip().str.extract(_DATE_DESC_RE).dropna()
+
+    # Match accounts and amounts in the format 'Account:SubAccount:SubSubAccount ₹Amount',
+    # one row per posting line, indexed by the block it belongs to
+    postings = lines.loc[headers.index, 2].str.split('\n').explode()
+    accounts = postings.str.strip().str.extract(_ACCOUNT_RE).dropna()
+
+    # Split the account string into its parts (Expense_1, Expense_2, Expense_3); missing parts are empty.
+    # Kept as object so a ledger without postings still yields string columns rather than float NaN ones
+    account_parts = accounts[0].str.split(':', n=2, expand=True).reindex(columns=range(3)).astype(object).fillna('')
+    headers = headers.loc[accounts.index]
+
+    return pd.DataFrame({
+        'Date': pd.to_datetime(headers[0], format='%Y/%m/%d').dt.strftime('%Y-%m-%d'),
+        'Description': headers[1],
+        # Remove commas from amounts, if present
+        'Amount': accounts[1].str.replace(',', '', regex=False).astype(float),
+        'Expense_1': account_parts[0],
+        'Expense_2': account_parts[1],
+        'Expense_3': account_parts[2],
+    }, columns=LEDGER_COLUMNS).reset_index(drop=True)
 
 # Function to write the parsed data to a CSV file
 def write_to_csv(data, output_file):
@@ -83,27 +91,63 @@ def write_to_csv(data, output_file):
     if not os.path.exists('files'):
         os.makedirs('files')
 
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(LEDGER_COLUMNS)
+
+    # Write each parsed row to the CSV buffer
+    writer.writerows(data.itertuples(index=False, name=None))
+    content = buffer.getvalue()
+
+    # Leave the file (and its mtime) untouched when the ledger hasn't changed,
+    # so downstream caches keyed on the mtime stay valid
+    if os.path.exists(output_file):
+        with open(output_file, 'r', newline='') as csvfile:
+            if csvfile.read() == content:
+                return False
+
     with open(output_file, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Date', 'Description', 'Amount', 'Expense_1', 'Expense_2', 'Expense_3'])
-        
-        # Write each parsed row to the CSV file
-        for row in data:
-            writer.writerow(row)
+        csvfile.write(content)
+    return True
+
+# Function to write the parsed data to a typed Parquet file
+def write_to_parquet(data, output_file):
+    # Missing account parts become nulls, as they would when reading the CSV
+    data = data.assign(
+        Date=pd.to_datetime(data['Date'], format='%Y-%m-%d'),
+        **{column: data[column].mask(data[column] == '') for column in ['Expense_1', 'Expense_2', 'Expense_3']},
+    )
+    table = pa.Table.from_pandas(data, schema=LEDGER_SCHEMA, preserve_index=False)
+    pq.write_table(table, output_file, compression='zstd')
 
 # Function to create the expense CSV
 def create_expense_csv():
-    # Fetch the ledger file content from S3
-    ledger_content = fetch_ledger_from_s3(S3_BUCKET_NAME, S3_OBJECT_KEY)
-    
     # Output file location
     output_file = 'files/ledger_output.csv'  # Output CSV file name
+    parquet_file = 'files/ledger_output.parquet'  # Typed copy read by load_data()
+    etag_file = 'files/ledger_output.etag'  # ETag of the ledger the outputs were built from
+
+    # Only trust the recorded ETag while the outputs built from it are still there
+    etag = None
+    if os.path.exists(etag_file) and os.path.exists(output_file) and os.path.exists(parquet_file):
+        with open(etag_file, 'r') as file:
+            etag = file.read()
+
+    # Fetch the ledger file content from S3
+    ledger_content, new_etag = fetch_ledger_from_s3(S3_BUCKET_NAME, S3_OBJECT_KEY, etag)
+    if ledger_content is None:
+        print(f"Ledger unchanged, keeping '{output_file}'.")
+        return
 
     # Parse the ledger content
-    parsed_data = parse_ledger_file(ledger_content)
+    parsed_data = parse_ledger_to_df(ledger_content)
+
+    # Write the parsed data to a CSV file, and refresh the Parquet copy whenever the CSV changes
+    if write_to_csv(parsed_data, output_file) or not os.path.exists(parquet_file):
+        write_to_parquet(parsed_data, parquet_file)
 
-    # Write the parsed data to a CSV file
-    write_to_csv(parsed_data, output_file)
+    with open(etag_file, 'w') as file:
+        file.write(new_etag)
 
     print(f"CSV file '{output_file}' has been created successfully.")
 
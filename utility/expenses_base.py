@@ -10,12 +10,14 @@ Key Features:
 4. Detailed breakdown of expenses by category
 
 Functions:
-- load_data(): Load and preprocess expense data
+- load_data(): Load and preprocess expense data, optionally only expense transactions
 - fetch_only_expenses(): Filter for expense transactions
 - fetch_only_expenses_excluding_home_loan(): Filter expenses excluding home loans
 - fetch_food_expenses(): Filter for food-related expenses
 - fetch_default_expenses(): Filter for predefined default expense categories
+- fetch_filtered_expenses(): Cached expenses for a given expense type and home loan option
 - fetch_hover_text(): Generate hover text for chart tooltips
+- join_hover_text(): Combine the hover text of the transactions in one bar
 - create_time_chart(): Create stacked bar charts for expense visualization
 
 UI Components:
@@ -36,38 +38,131 @@ Run this script with Streamlit to launch the interactive dashboard.
 
 import os
 import sys
+import json
+import shutil
+import tempfile
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
 import plotly.graph_objs as go
 from utility.expense_parsing import create_expense_csv
 
 
+# Typed copy of the parsed ledger written by create_expense_csv()
+LEDGER_PARQUET = "files/ledger_output.parquet"
+# Parquet dataset partitioned by month, so scans can skip whole months and filter in Arrow
+LEDGER_DATASET = "files/ledger_output"
+LEDGER_DATASET_META = "files/ledger_output.json"
+LEDGER_PARTITION_COLUMN = "Partition"
+# Expense_2 categories shown in the "Default Expenses" view
+DEFAULT_EXPENSE_CATEGORIES = pd.Index(['Bike', 'Entertainment', 'Food', 'Vice', 'Subscriptions', 'Home', 'SelfCare'])
+# Bump whenever load_data() changes how the ledger is normalized, to invalidate old caches
+LEDGER_CACHE_VERSION = 7
+# Seconds before the in-memory ledger caches expire, so ledger edits show up without a restart
+LEDGER_CACHE_TTL = 3600
+# Transactions listed in a chart bar's hover before the rest are only counted
+MAX_HOVER_TRANSACTIONS = 5
+# Arrow equivalent of only_expenses(), pushed down into the cached dataset scan
+EXPENSES_FILTER = (
+    pc.field('Expense_1').isin(['Expenses', 'Assets'])
+    & (pc.field('Expense_2').is_null() | (pc.field('Expense_2') != 'Banking'))
+)
+
+
+def read_cached_ledger(filter=None):
+    """
+    Return the normalized ledger from the Parquet cache if it was built from
+    the current parsed ledger, otherwise None.
+
+    :param filter: Optional Arrow expression applied while scanning the dataset
+    """
+    if not (os.path.isdir(LEDGER_DATASET) and os.path.exists(LEDGER_DATASET_META)):
+        return None
+    with open(LEDGER_DATASET_META, 'r') as file:
+        meta = json.load(file)
+    if meta.get('version') != LEDGER_CACHE_VERSION or meta.get('source_mtime') != os.path.getmtime(LEDGER_PARQUET):
+        return None
+    dataset = pads.dataset(LEDGER_DATASET, format="parquet", partitioning="hive")
+    columns = [name for name in dataset.schema.names if name != LEDGER_PARTITION_COLUMN]
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+
+def write_cached_ledger(df):
+    """
+    Persist the normalized ledger as a month-partitioned Parquet dataset, along with
+    the mtime of the parsed ledger it was built from.
+
+    The dataset is written to a private sibling directory and swapped into place before
+    the metadata is updated, so readers and concurrent rebuilds (load_data() caches each
+    expenses_only value separately) never see a partial dataset.
+    """
+    table = pa.Table.from_pandas(df.assign(**{LEDGER_PARTITION_COLUMN: df['Date'].dt.strftime('%Y-%m')}), preserve_index=False)
+    staging = tempfile.mkdtemp(dir=os.path.dirname(LEDGER_DATASET), prefix=f".{os.path.basename(LEDGER_DATASET)}-")
+    pads.write_dataset(
+        table,
+        staging,
+        format="parquet",
+        partitioning=pads.partitioning(pa.schema([(LEDGER_PARTITION_COLUMN, pa.string())]), flavor="hive"),
+        file_options=pads.ParquetFileFormat().make_write_options(compression="zstd"),
+    )
+
+    # Move the old dataset aside rather than writing over it, so months that disappeared from the ledger don't linger
+    retired = f"{staging}.old"
+    try:
+        os.replace(LEDGER_DATASET, retired)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(staging, LEDGER_DATASET)
+    except OSError:
+        # A concurrent rebuild swapped in its copy of the same ledger first
+        shutil.rmtree(staging, ignore_errors=True)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    meta_tmp = f"{staging}.json"
+    with open(meta_tmp, 'w') as file:
+        json.dump({'version': LEDGER_CACHE_VERSION, 'source_mtime': os.path.getmtime(LEDGER_PARQUET)}, file)
+    os.replace(meta_tmp, LEDGER_DATASET_META)
+
+
+def only_expenses(df):
+    """Keep expense and asset transactions, excluding banking entries."""
+    return df.query("(Expense_1 == 'Expenses' or Expense_1 == 'Assets') and Expense_2 != 'Banking'")
+
+
 # Load data
-@st.cache_data
-def load_data():
+@st.cache_data(ttl=LEDGER_CACHE_TTL, show_spinner=False)
+def load_data(expenses_only=False):
     create_expense_csv()
-    # Load the CSV into a DataFrame
-    df = pd.read_csv("files/ledger_output.csv", parse_dates=["Date"])
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Day of Week'] = df['Date'].dt.day_name()  # Add day of the week
-    df['Amount'] = pd.to_numeric(df['Amount'].replace('₹', '', regex=True).replace(',', '', regex=True), errors='coerce')
-    df['DateGroup'] = df['Date'].dt.strftime('%Y-%m-%d')
-    df['Week'] = df['Date'].dt.to_period('W').astype(str)
-    df['Month'] = df['Date'].dt.to_period('M').astype(str)
+
+    # Skip the normalization if the ledger hasn't changed since the last run
+    df = read_cached_ledger(filter=EXPENSES_FILTER if expenses_only else None)
+    if df is not None:
+        return df
+
+    # The parsed ledger is stored typed, so dates and amounts don't need re-parsing from text
+    df = pd.read_parquet(LEDGER_PARQUET)
+
+    # Keep the date groupings typed so they group on integers; charts format them for display
+    df['DateGroup'] = df['Date'].dt.normalize()
+    df['Week'] = df['Date'].dt.to_period('W')
+    df['Month'] = df['Date'].dt.to_period('M')
 
     # Check for 'Expense_2' and 'Expense_3' conditions and adjust 'Amount'
     df.loc[(df['Expense_2'] == 'Home') & (df['Expense_3'] == 'Loan'), 'Amount'] /= 2
-    return df
+
+    write_cached_ledger(df)
+    return only_expenses(df) if expenses_only else df
 
 
 def fetch_only_expenses():
-    df = load_data()
-    df = df[(df['Expense_1'] == 'Expenses') | (df['Expense_1'] == 'Assets')]
-    df = df[df['Expense_2'] != 'Banking']
-    return df
+    return load_data(expenses_only=True)
 
 def fetch_only_expenses_excluding_home_loan():
     df = fetch_only_expenses()
@@ -81,7 +176,7 @@ def fetch_food_expenses():
 
 def fetch_default_expenses():
     df = fetch_only_expenses()
-    df = df[df['Expense_2'].isin(['Bike', 'Entertainment', 'Food', 'Vice', 'Subscriptions', 'Home', 'SelfCare'])]
+    df = df[df['Expense_2'].isin(DEFAULT_EXPENSE_CATEGORIES)]
     # Define a list of exclusions for combinations of 'Expense_2' and 'Expense_3'
     exclusions = [
         ('Home', 'Furniture'),
@@ -96,6 +191,24 @@ def fetch_default_expenses():
         df = df[~((df['Expense_2'] == expense_2) & (df['Expense_3'] == expense_3))]
     return df
 
+@st.cache_data(ttl=LEDGER_CACHE_TTL, show_spinner=False)
+def fetch_filtered_expenses(expense_type="All", include_home_loan=True):
+    """
+    Fetch the expenses for the dashboard's filter form, memoized per filter combination.
+
+    :param expense_type: "All" or "Default Expenses"
+    :param include_home_loan: Whether to keep home loan transactions
+    :return: Filtered DataFrame
+    """
+    if expense_type == "Default Expenses":
+        df = fetch_default_expenses()
+    else:
+        df = fetch_only_expenses()
+
+    if not include_home_loan:
+        df = df.query("Expense_3 != 'Loan'")
+    return df
+
 def format_hover_text(expense_1, expense_2, expense_3, description, amount, date):
     """
     Format the hover text for a single row of data.
@@ -117,12 +230,25 @@ def fetch_hover_text(df):
     :param df: DataFrame containing the expense data
     :return: List of formatted hover text strings
     """
-    return [
-        format_hover_text(expense_1, expense_2, expense_3, description, amount, date)
-        for expense_1, expense_2, expense_3, description, amount, date in zip(
-            df['Expense_1'], df['Expense_2'], df['Expense_3'], df['Description'], df['Amount'], df['Date']
-        )
-    ]
+    # Same format as format_hover_text, built column-wise rather than row by row
+    amounts = pd.Series(np.char.mod('%.2f', df['Amount'].to_numpy(dtype=np.float64)), index=df.index)
+    hover_text = (
+        df['Expense_1'].astype(str) + " (" + df['Expense_2'].astype(str) + ", " + df['Expense_3'].astype(str) + ")<br>"
+        + df['Description'].astype(str) + "<br>"
+        + df['Date'].dt.strftime('%Y-%m-%d') + ", " + amounts + " ₹"
+    )
+    return hover_text.tolist()
+
+def join_hover_text(hover_text):
+    """
+    Combine the hover text of the transactions that make up one bar.
+
+    :param hover_text: Series of hover text strings, most relevant first
+    :return: The first MAX_HOVER_TRANSACTIONS entries, with a count of the rest
+    """
+    shown = hover_text.iloc[:MAX_HOVER_TRANSACTIONS].str.cat(sep="<br><br>")
+    hidden = len(hover_text) - MAX_HOVER_TRANSACTIONS
+    return f"{shown}<br><br>…and {hidden} more" if hidden > 0 else shown
 
 def format_in_indian_system(number):
     if number >= 1e7:
@@ -10,10 +10,12 @@ The main features of this module include:
 
 Functions:
 - parse_time_blocks(file_path, file_date): Parse time blocks from a single file
-- process_files(base_path): Process all files within a specified date range
+- process_files(base_path, max_workers=8): Process all files within a specified date range, in parallel
 - fetch_activities(): Return a dictionary of activity categories and their associated keywords
 - assign_activity(row): Assign an activity category to a given row of data
+- assign_activities(activities): Assign activity categories to a whole Series at once
 - save_to_csv(results, output_file): Save processed results to a CSV file
+- read_time_blocks(file_path, mtime): Read the raw CSV into a DataFrame, cached on its mtime
 - fetch_time_blocks(): Main function to process all time blocks and return a DataFrame
 
 Usage:
@@ -23,12 +25,12 @@ process all time blocks and get a pandas DataFrame with the results.
 
 Dependencies:
 - os
-- csv
 - datetime
 - re
 - streamlit
 - dotenv
 - pandas
+- pyarrow
 
 Environment Variables:
 - OBSIDIAN_DAILY_NOTES_PATH: Path to the directory containing Obsidian daily notes
@@ -38,16 +40,21 @@ Output Files:
 - files/time_blocks_parsed.csv: Processed time blocks with additional information
 
 Note: This module uses Streamlit's caching mechanism (@st.cache_data) to improve performance
-when fetching time blocks repeatedly.
+when fetching time blocks repeatedly: the CSV is only re-parsed after it changes.
 """
 
 import os
-import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
 import streamlit as st
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 
 # Load environment variables
 load_dotenv()
@@ -56,6 +63,58 @@ load_dotenv()
 OBSIDIAN_BASE_PATH = os.getenv('OBSIDIAN_BASE_PATH')
 OBSIDIAN_DAILY_NOTES_PATH = os.path.join(OBSIDIAN_BASE_PATH, os.getenv('OBSIDIAN_DAILY_NOTES_PATH'))
 time_blocks_file = "files/time_blocks.csv"
+# Column types of the raw time blocks CSV. Times stay as their HH:MM labels; the chart
+# positions are derived from them numerically
+TIME_BLOCK_COLUMN_TYPES = {
+    'Date': pa.timestamp('ns'),
+    'Start Time': pa.string(),
+    'End Time': pa.string(),
+    'Duration': pa.string(),
+    'Activity': pa.string(),
+}
+
+# A completed time block task, e.g. "- [x] 09:00 - 10:30 Deep work ✅ 2024-07-01".
+# Matched on the raw UTF-8 bytes so notes are never decoded as a whole.
+_TIME_BLOCK_RE = re.compile(r'- \[x\] (\d{2}:\d{2}) - (\d{2}:\d{2})(?:[:\s]*)(.+?)(?:\s✅.*)?$'.encode(), re.MULTILINE)
+
+# Activity categories with their chart colors and the keywords that identify them
+_ACTIVITIES = {
+    'Sleep': {'color': 'black', 'keywords': ['Sleep', 'Nap', 'Bed', 'Wind Down']},
+    'Admin': {'color': 'orange', 'keywords': ['Chores', 'Prep', 'Dishes', 'Bath', 'Breakfast', 'Dinner', 'Lunch', 'Commute', 'Travel', 'Bus']},
+    'Workout': {'color': 'green', 'keywords': ['Workout', 'Gym', 'Stretch']},
+    'Work': {'color': 'blue', 'keywords': ['Office', 'Work', 'Toplyne']},
+    'Projects': {'color': 'purple', 'keywords': ['Expenses', 'Project', 'Obsidian', 'Budgeting and Expense', 'Ledger', 'Life Admin', 'Maintenance', 'Push', 'Grind' ]},
+    'Learning': {'color': 'purple', 'keywords': ['Learning', 'Learn', 'Brilliant.org']},
+    'Reflection': {'color': 'purple', 'keywords': ['Journal', 'Review', 'Plan']},
+    'Chill': {'color': 'red', 'keywords': ['Chill', 'YouTube', 'Movie', 'TV', 'Standup', 'Trip']},
+    'Social': {'color': 'yellow', 'keywords': ['Catchup', 'Social']},
+    'Chess': {'color': 'pink', 'keywords': ['Chess']},
+    'Reading-Writing': {'color': 'purple', 'keywords': ['Read', 'Book', 'Writing']},
+    'Meditation': {'color': 'cyan', 'keywords': ['Meditation', 'Mindfulness']},
+    'Filler': {'color': 'white', 'keywords': ['']},
+}
+
+# Lowercased (keyword, category) pairs in category order, for matching one activity at a time
+_ACTIVITY_KEYWORDS = tuple(
+    (keyword.lower(), activity) for activity, details in _ACTIVITIES.items() for keyword in details['keywords']
+)
+
+def _minutes_since_midnight(times):
+    """
+    Convert b"HH:MM" strings to minutes since midnight in one array operation.
+
+    Args:
+    times (sequence of bytes): Times captured by _TIME_BLOCK_RE
+
+    Returns:
+    numpy.ndarray: Minutes since midnight for each time
+    """
+    digits = np.frombuffer(b''.join(times), dtype=np.uint8).reshape(-1, 5).astype(np.int32) - ord('0')
+    hours = digits[:, 0] * 10 + digits[:, 1]
+    minutes = digits[:, 3] * 10 + digits[:, 4]
+    if ((hours > 23) | (minutes > 59)).any():
+        raise ValueError(f"Invalid time block time in {[time.decode() for time in times]}")
+    return hours * 60 + minutes
 
 def parse_time_blocks(file_path, file_date):
     """
@@ -68,32 +127,69 @@ def parse_time_blocks(file_path, file_date):
     Returns:
     list: List of tuples containing (start_datetime, end_datetime, duration, activity)
     """
-    with open(file_path, 'r') as file:
+    with open(file_path, 'rb') as file:
         content = file.read()
 
-    time_blocks = re.findall(r'- \[x\] (\d{2}:\d{2}) - (\d{2}:\d{2})(?:[:\s]*)(.+?)(?:\s✅.*)?$', content, re.MULTILINE)
-    
-    parsed_blocks = []
-    for start_time, end_time, activity in time_blocks:
-        start_datetime = datetime.combine(file_date, datetime.strptime(start_time, "%H:%M").time())
-        end_datetime = datetime.combine(file_date, datetime.strptime(end_time, "%H:%M").time())
+    # Most notes have no completed blocks; a substring scan is far cheaper than the regex
+    if b'- [x] ' not in content:
+        return []
+
+    time_blocks = _TIME_BLOCK_RE.findall(content)
+    if not time_blocks:
+        return []
+
+    # Do the datetime math for all of the file's blocks as arrays
+    start_times, end_times, activities = zip(*time_blocks)
+    start_minutes = _minutes_since_midnight(start_times)
+    # Blocks that end before they start run past midnight
+    durations = (_minutes_since_midnight(end_times) - start_minutes) % (24 * 60)
 
-        duration = end_datetime - start_datetime
-        
-        if duration.total_seconds() < 0:
-            end_datetime += timedelta(days=1)
-            duration = end_datetime - start_datetime
+    day = np.datetime64(file_date, 'm')
+    start_datetimes = day + start_minutes.astype('timedelta64[m]')
+    end_datetimes = start_datetimes + durations.astype('timedelta64[m]')
 
-        parsed_blocks.append((start_datetime, end_datetime, duration, activity.strip()))
-    
-    return parsed_blocks
+    return list(zip(
+        start_datetimes.tolist(),
+        end_datetimes.tolist(),
+        durations.astype('timedelta64[m]').tolist(),
+        (activity.decode().strip() for activity in activities),
+    ))
 
-def process_files(base_path):
+def _time_block_rows(file_path, file_date):
+    """
+    Parse one daily note into CSV rows.
+
+    Args:
+    file_path (str): Path to the Markdown file
+    file_date (datetime.date): Date of the file
+
+    Returns:
+    list: List of lists containing [date, start_time, end_time, duration, activity]
+    """
+    try:
+        time_blocks = parse_time_blocks(file_path, file_date)
+    except FileNotFoundError:
+        # The note was removed (or renamed by a sync) after the directory was listed
+        return []
+
+    return [
+        [
+            start_datetime.strftime("%Y-%m-%d"),
+            start_datetime.strftime("%H:%M"),
+            end_datetime.strftime("%H:%M"),
+            str(duration),
+            activity
+        ]
+        for start_datetime, end_datetime, duration, activity in time_blocks
+    ]
+
+def process_files(base_path, max_workers=8):
     """
     Process all files within a specified date range.
 
     Args:
     base_path (str): Path to the directory containing daily note files
+    max_workers (int): Number of threads reading and parsing notes concurrently
 
     Returns:
     list: List of lists containing [date, start_time, end_time, duration, activity]
@@ -101,27 +197,25 @@ def process_files(base_path):
     start_date = datetime(2024, 7, 1).date()
     current_date = datetime.now().date()
 
-    results = []
-
-    while current_date >= start_date:
-        file_name = current_date.strftime("%Y-%m-%d") + ".md"
-        file_path = os.path.join(base_path, file_name)
-        
-        if os.path.exists(file_path):
-            time_blocks = parse_time_blocks(file_path, current_date)
-            for start_datetime, end_datetime, duration, activity in time_blocks:
-                results.append([
-                    start_datetime.strftime("%Y-%m-%d"),
-                    start_datetime.strftime("%H:%M"),
-                    end_datetime.strftime("%H:%M"),
-                    str(duration),
-                    activity
-                ])
-        
-        current_date -= timedelta(days=1)
-        print(current_date)
-    
-    return results
+    # No notes folder (e.g. the vault isn't synced to this machine) means no time blocks
+    if not os.path.isdir(base_path):
+        return []
+
+    # List the notes once instead of checking every date in the range for a file
+    with os.scandir(base_path) as entries:
+        note_files = {entry.name for entry in entries if entry.is_file()}
+
+    # Newest first, keeping only the days that have a note
+    dates = [current_date - timedelta(days=offset) for offset in range((current_date - start_date).days + 1)]
+    dates = [date for date in dates if f"{date:%Y-%m-%d}.md" in note_files]
+
+    # Each note is independent, so reads overlap across threads; map keeps the date order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        file_rows = executor.map(
+            lambda date: _time_block_rows(os.path.join(base_path, f"{date:%Y-%m-%d}.md"), date),
+            dates
+        )
+        return [row for rows in file_rows for row in rows]
 
 def fetch_activities():
     """
@@ -130,21 +224,7 @@ def fetch_activities():
     Returns:
     dict: Dictionary of activity categories with their colors and keywords
     """
-    return{
-            'Sleep': {'color': 'black', 'keywords': ['Sleep', 'Nap', 'Bed', 'Wind Down']},
-            'Admin': {'color': 'orange', 'keywords': ['Chores', 'Prep', 'Dishes', 'Bath', 'Breakfast', 'Dinner', 'Lunch', 'Commute', 'Travel', 'Bus']},
-            'Workout': {'color': 'green', 'keywords': ['Workout', 'Gym', 'Stretch']},
-            'Work': {'color': 'blue', 'keywords': ['Office', 'Work', 'Toplyne']},
-            'Projects': {'color': 'purple', 'keywords': ['Expenses', 'Project', 'Obsidian', 'Budgeting and Expense', 'Ledger', 'Life Admin', 'Maintenance', 'Push', 'Grind' ]},
-            'Learning': {'color': 'purple', 'keywords': ['Learning', 'Learn', 'Brilliant.org']},
-            'Reflection': {'color': 'purple', 'keywords': ['Journal', 'Review', 'Plan']},
-            'Chill': {'color': 'red', 'keywords': ['Chill', 'YouTube', 'Movie', 'TV', 'Standup', 'Trip']},
-            'Social': {'color': 'yellow', 'keywords': ['Catchup', 'Social']},
-            'Chess': {'color': 'pink', 'keywords': ['Chess']},
-            'Reading-Writing': {'color': 'purple', 'keywords': ['Read', 'Book', 'Writing']},
-            'Meditation': {'color': 'cyan', 'keywords': ['Meditation', 'Mindfulness']},
-            'Filler': {'color': 'white', 'keywords': ['']},
-        }
+    return _ACTIVITIES
 
 def assign_activity(row):
     """
@@ -156,52 +236,127 @@ def assign_activity(row):
     Returns:
     str: The assigned activity category
     """
-    activities = fetch_activities()
+    activity = row['Activity'].lower()
+    return next((category for keyword, category in _ACTIVITY_KEYWORDS if keyword in activity), 'Other')  # Fallback if no match is found
+
+@lru_cache(maxsize=None)
+def _activity_patterns():
+    """
+    Compile one case-insensitive keyword alternation per activity category.
+
+    Returns:
+    dict: Activity category to compiled pattern, in fetch_activities() order
+    """
+    return {
+        activity: re.compile('|'.join(map(re.escape, details['keywords'])), re.IGNORECASE)
+        for activity, details in fetch_activities().items()
+    }
+
+def assign_activities(activities):
+    """
+    Assign an activity category to every activity in a Series.
+
+    Vectorized version of assign_activity: the first category with a keyword in the activity wins.
+
+    Args:
+    activities (pandas.Series): Activity names
 
-    for activity, details in activities.items():
-        if any(keyword.lower() in row['Activity'].lower() for keyword in details['keywords']):
-            return activity
-    return 'Other'  # Fallback if no match is found
+    Returns:
+    pandas.Series: The assigned activity categories
+    """
+    patterns = _activity_patterns()
+    conditions = [activities.str.contains(pattern, na=False) for pattern in patterns.values()]
+    return pd.Series(np.select(conditions, list(patterns), default='Other'), index=activities.index)
 
 def save_to_csv(results, output_file):
     """
     Save processed results to a CSV file.
 
+    The file (and its mtime) is left untouched when the content hasn't changed,
+    so read_time_blocks() keeps serving its cached DataFrame.
+
     Args:
     results (list): List of lists containing time block data
     output_file (str): Path to the output CSV file
     """
-    with open(output_file, 'w', newline='') as csvfile:
+    # Transpose the rows into string columns and let Arrow's C writer render the CSV
+    columns = ['Date', 'Start Time', 'End Time', 'Duration', 'Activity']
+    column_values = list(zip(*results)) or [()] * len(columns)
+    table = pa.table({column: pa.array(values, pa.string()) for column, values in zip(columns, column_values)})
+    buffer = pa.BufferOutputStream()
+    pacsv.write_csv(table, buffer, write_options=pacsv.WriteOptions(quoting_style='needed'))
+    content = buffer.getvalue().to_pybytes()
+
+    if os.path.exists(output_file):
+        with open(output_file, 'rb') as csvfile:
+            if csvfile.read() == content:
+                return
+
+    with open(output_file, 'wb') as csvfile:
         print ("Writing File")
-        writer = csv.writer(csvfile)
-        writer.writerow(['Date', 'Start Time', 'End Time', 'Duration', 'Activity'])
-        writer.writerows(results)
+        csvfile.write(content)
 
-def fetch_time_blocks():
+def _minutes_from_labels(times):
     """
-    Main function to process all time blocks and return a DataFrame.
+    Convert an Arrow column of "HH:MM" labels to minutes since midnight.
 
-    This function is cached using Streamlit's caching mechanism to improve performance.
+    Args:
+    times (pyarrow.ChunkedArray): Time labels as written by save_to_csv()
 
     Returns:
-    pandas.DataFrame: DataFrame containing processed time block data
+    numpy.ndarray: Minutes since midnight as int16
     """
-    print ("Processing Files")
-    results = process_files(OBSIDIAN_DAILY_NOTES_PATH)
-    save_to_csv(results, time_blocks_file)
+    hours = pc.cast(pc.utf8_slice_codeunits(times, 0, 2), pa.int16())
+    minutes = pc.cast(pc.utf8_slice_codeunits(times, 3, 5), pa.int16())
+    return pc.add(pc.multiply(hours, 60), minutes).to_numpy()
+
+@st.cache_data(show_spinner=False)
+def read_time_blocks(file_path, mtime):
+    """
+    Read the raw time blocks CSV and add the derived columns.
+
+    Cached on the file path and its modification time, so reruns skip the parse
+    until the CSV is rewritten.
+
+    Args:
+    file_path (str): Path to the raw time blocks CSV
+    mtime (float): Modification time of the CSV, only used as part of the cache key
 
-    df = pd.read_csv(time_blocks_file)
+    Returns:
+    pandas.DataFrame: DataFrame containing processed time block data
+    """
+    # Arrow parses the dates while reading, so no to_datetime passes are needed
+    table = pacsv.read_csv(file_path, convert_options=pacsv.ConvertOptions(column_types=TIME_BLOCK_COLUMN_TYPES))
+    df = table.to_pandas()
     print (df.head())
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Start Time'] = pd.to_datetime(df['Start Time'], format='%H:%M').dt.time
-    df['End Time'] = pd.to_datetime(df['End Time'], format='%H:%M').dt.time
+    # Hours since midnight as floats, so chart positions and durations are plain vector arithmetic
+    df['Start_Hours'] = _minutes_from_labels(table['Start Time']) / 60
+    df['End_Hours'] = _minutes_from_labels(table['End Time']) / 60
     df['Day of Week'] = df['Date'].dt.day_name()  # Add day of the week
+    # Bin the dates once for the daily/weekly/monthly charts, kept typed so they group on integers
+    df['DateGroup'] = df['Date'].dt.normalize()
+    df['Week'] = df['Date'].dt.to_period('W')
+    df['Month'] = df['Date'].dt.to_period('M')
     df['Duration'] = pd.to_timedelta(df['Duration'])
     df['Duration_Hours'] = df['Duration'].dt.total_seconds() / 3600
-    df['Activity Category'] = df.apply(assign_activity, axis=1)
+    df['Activity Category'] = assign_activities(df['Activity'])
     df.to_csv('files/time_blocks_parsed.csv', index=False)
     return df
 
+def fetch_time_blocks():
+    """
+    Main function to process all time blocks and return a DataFrame.
+
+    The notes are scanned on every call; the CSV parse is cached by read_time_blocks().
+
+    Returns:
+    pandas.DataFrame: DataFrame containing processed time block data
+    """
+    print ("Processing Files")
+    results = process_files(OBSIDIAN_DAILY_NOTES_PATH)
+    save_to_csv(results, time_blocks_file)
+    return read_time_blocks(time_blocks_file, os.path.getmtime(time_blocks_file))
+
 def main():
     """
     Main function to execute the time block fetching process.
@@ -2,23 +2,54 @@ import os
 from datetime import datetime
 import streamlit as st
 from components.budget_manager import BudgetManager
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from utility.time_block_parsing import fetch_time_blocks, fetch_activities, assign_activity
-
-def fetch_hover_text(df):
-    return [f"Activity: {activity}<br>"
-            f"Date: {date.date()}<br>"
-            f"Day: {day}<br>"
-            f"Time: {start_time} - {end_time}<br>"
-            f"Duration: {duration}"
-            for activity, day, date, start_time, end_time, duration
-            in zip(df['Activity'],
-                   df['Day of Week'],
-                   df['Date'],
-                   df['Start Time'],
-                   df['End Time'],
-                   df['Duration'])]
+from utility.time_block_parsing import fetch_time_blocks
+
+# Date grouping column, chart title and x-axis title for each view type
+VIEW_TYPES = {
+    'daily': ('DateGroup', 'Daily Breakdown', 'Date'),
+    'weekly': ('Week', 'Weekly Breakdown', 'Week'),
+    'monthly': ('Month', 'Monthly Breakdown', 'Month'),
+}
+
+def fetch_hover_text(df, x_values, xaxis_title):
+    # Built column-wise rather than row by row; totals read better in hours than as timedeltas
+    hours = pd.Series(np.char.mod('%.2f', df['Duration'].dt.total_seconds().to_numpy() / 3600), index=df.index)
+    hover_text = (
+        "Activity: " + df['Activity'].astype(str) + "<br>"
+        + f"{xaxis_title}: " + df[x_values].astype(str) + "<br>"
+        + "Blocks: " + df['Blocks'].astype(str) + "<br>"
+        + "Duration: " + hours + "h"
+    )
+    return hover_text.tolist()
+
+@st.cache_data(show_spinner=False)
+def aggregate_time_blocks(df, view_type):
+    """
+    Total the time spent per date grouping and activity.
+
+    Cached on the data and view type, so reruns and revisited tabs skip the groupby.
+
+    :param df: DataFrame containing the budget data
+    :param view_type: String indicating the type of view ('daily', 'weekly', or 'monthly')
+    :return: DataFrame with the date grouping, Activity, total Duration and number of Blocks
+    """
+    # The date groupings are binned once by read_time_blocks()
+    x_values = VIEW_TYPES[view_type][0]
+    grouped_df = (
+        df.groupby([x_values, 'Activity'], observed=True)['Duration']
+        .agg(Duration='sum', Blocks='count')
+        .reset_index()
+    )
+
+    # Format the date grouping as axis labels only after grouping
+    if view_type == 'daily':
+        grouped_df[x_values] = grouped_df[x_values].dt.strftime('%Y-%m-%d')
+    else:
+        grouped_df[x_values] = grouped_df[x_values].astype(str)
+    return grouped_df
 
 def create_time_chart(df, view_type, budget_name):
     """
@@ -29,38 +60,23 @@ def create_time_chart(df, view_type, budget_name):
     :param budget_name: Name of the budget for the chart title
     :return: Plotly figure object
     """
-    if view_type == 'daily':
-        df['DateGroup'] = df['Date'].dt.strftime('%Y-%m-%d')
-        x_values = 'DateGroup'
-        title = f"Daily Breakdown - {budget_name}"
-        xaxis_title = "Date"
-    elif view_type == 'weekly':
-        df['Week'] = df['Date'].dt.to_period('W').astype(str)
-        x_values = 'Week'
-        title = f"Weekly Breakdown - {budget_name}"
-        xaxis_title = "Week"
-    elif view_type == 'monthly':
-        df['Month'] = df['Date'].dt.to_period('M').astype(str)
-        x_values = 'Month'
-        title = f"Monthly Breakdown - {budget_name}"
-        xaxis_title = "Month"
-    else:
+    if view_type not in VIEW_TYPES:
         raise ValueError("Invalid view type. Choose 'daily', 'weekly', or 'monthly'.")
 
-    # Group the data by Date and Assigned Activity
-    grouped_df = df.groupby([x_values, 'Date', 'Activity', 'Activity Category', 'Day of Week', 'Start Time', 'End Time'])['Duration'].sum().reset_index()
+    x_values, title, xaxis_title = VIEW_TYPES[view_type]
+    grouped_df = aggregate_time_blocks(df, view_type)
 
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
         x=grouped_df[x_values],
         y=grouped_df['Duration'].dt.total_seconds() / 3600,
-        hovertext=fetch_hover_text(grouped_df),
+        hovertext=fetch_hover_text(grouped_df, x_values, xaxis_title),
         hoverinfo='text'  # Only display hover text
     ))
 
     fig.update_layout(
-        title=title,
+        title=f"{title} - {budget_name}",
         xaxis_title=xaxis_title,
         yaxis_title="Hours",
         barmode='stack',
@@ -69,27 +85,29 @@ def create_time_chart(df, view_type, budget_name):
     return fig
 
 def main():
+    # fetch_time_blocks() already assigns 'Activity Category'
     df = fetch_time_blocks()
 
-    df['Activity Category'] = df.apply(assign_activity, axis=1)
-    
     budget_manager = BudgetManager()
     active_budgets = budget_manager.get_active_budgets()
     st.subheader("Active Budgets")
 
+    # Partition the blocks by category once instead of masking the whole frame per budget
+    category_dfs = dict(list(df.groupby('Activity Category', sort=False)))
+
     for budget in active_budgets:
         with st.expander(f"{budget['name']}"):
-            budget_df = df[(df['Activity Category'] == budget['name'])]
+            budget_df = category_dfs.get(budget['name'], df.iloc[:0])
+            budget_df = budget_df[budget_df['Date'].between(pd.Timestamp(budget['start_date']), pd.Timestamp(budget['end_date']))]
             print("budget_df")
             print(budget_df)
-            actual_value = budget_df['Duration'].sum().total_seconds() / 3600  # Convert to hours
-            progress = budget_manager.calculate_progress(budget['name'], actual_value)
+            total_hours = budget_df['Duration'].sum().total_seconds() / 3600  # Convert to hours
+            progress = budget_manager.calculate_progress(budget['name'], total_hours)
 
             if progress:
                 st.progress(min(progress['progress_percentage'] / 100, 1.0))
                 st.write(f"Progress: {progress['progress_percentage']:.1f}%")
 
-            total_hours = budget_df['Duration'].sum().total_seconds() / 3600
             st.write(f"Target: {budget['target']} {budget['unit']}, Actual: {total_hours:.1f} hours")
             start_date = datetime.strptime(budget['start_date'], "%Y-%m-%d").strftime("%d %b %Y")
             end_date = datetime.strptime(budget['end_date'], "%Y-%m-%d").strftime("%d %b %Y")
@@ -1,62 +1,50 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, time
-from utility.time_block_parsing import fetch_time_blocks, fetch_activities, assign_activity
+from utility.time_block_parsing import fetch_time_blocks, fetch_activities
 import streamlit as st
 
-def time_to_float(t):
-    return t.hour + t.minute / 60
-
-def calculate_duration(start_time, end_time):
-    """Calculate duration in hours between two time objects"""
-    # Convert times to minutes since midnight
-    start_minutes = start_time.hour * 60 + start_time.minute
-    end_minutes = end_time.hour * 60 + end_time.minute
-    
-    # Calculate duration in minutes
-    duration_minutes = end_minutes - start_minutes
-    
-    # Convert to hours
-    duration_hours = duration_minutes / 60
-    
-    return duration_hours
-
-def fetch_productive_time_blocks():
-    df = fetch_time_blocks()
+def fetch_productive_time_blocks(df=None):
+    if df is None:
+        df = fetch_time_blocks()
     df = df[df['Activity Category'].isin(['Workout', 'Work', 'Projects', 'Learning', 'Reading-Writing', 'Meditation', 'Chess', 'Reflection'])]
     return df
 
-def fetch_chill_time_blocks():
-    df = fetch_time_blocks()
+def fetch_chill_time_blocks(df=None):
+    if df is None:
+        df = fetch_time_blocks()
     df = df[df['Activity Category'].isin(['Chill', 'Social'])]
     return df
 
 def fetch_hover_text(df):
     # Ensure columns exist in DataFrame
     if all(col in df.columns for col in ['Activity', 'Activity Category', 'Day of Week', 'Date', 'Start Time', 'End Time', 'Duration_Hours']):
-        return [f"{activity} ({category}) ({day}, {date.date()}, {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}, {duration:.2f}h)" 
-                for activity, category, day, date, start_time, end_time, duration  
-                in zip(df['Activity'],
-                       df['Activity Category'], 
-                       df['Day of Week'], 
-                       df['Date'], 
-                       df['Start Time'], 
-                       df['End Time'],
-                       df['Duration_Hours'])]
+        # Same text as formatting each row, built column-wise
+        durations = pd.Series(np.char.mod('%.2f', df['Duration_Hours'].to_numpy(dtype=np.float64)), index=df.index)
+        hover_text = (
+            df['Activity'].astype(str) + " (" + df['Activity Category'].astype(str) + ") ("
+            + df['Day of Week'].astype(str) + ", " + df['Date'].dt.strftime('%Y-%m-%d') + ", "
+            + df['Start Time'] + " - " + df['End Time'] + ", "
+            + durations + "h)"
+        )
+        return hover_text.tolist()
     else:
         return [''] * len(df)
 
 def generate_time_blocks_heatmap(df):
     fig = go.Figure()
 
+    # Partition the blocks by category in one pass instead of masking the frame once per activity
+    activity_dfs = dict(list(df.groupby('Activity Category', sort=False)))
     for activity, details in fetch_activities().items():
-        activity_df = df[df['Activity Category'] == activity]
+        activity_df = activity_dfs.get(activity, df.iloc[:0])
         
         # Calculate durations using Duration_Hours column instead of recalculating
         fig.add_trace(go.Bar(
             x=activity_df['Date'],
             y=activity_df['Duration_Hours'],  # Use the pre-calculated Duration_Hours
-            base=[time_to_float(start) for start in activity_df['Start Time']],
+            base=activity_df['Start_Hours'],
             name=activity,
             marker_color=details['color'],
             hovertext=fetch_hover_text(activity_df),
@@ -91,15 +79,15 @@ def generate_time_blocks_heatmap(df):
 def generate_duration_count_chart(df):
     fig = go.Figure()
 
-    # Calculate durations before grouping
-    df['Duration_Hours'] = [calculate_duration(start, end) 
-                           for start, end in zip(df['Start Time'], df['End Time'])]
+    # Calculate durations before grouping, as end minus start within the same day
+    df['Duration_Hours'] = df['End_Hours'] - df['Start_Hours']
     
     # Group by Date and Activity Category and sum the Duration_Hours
     grouped_df = df.groupby(['Date', 'Activity Category', 'Day of Week'])['Duration_Hours'].sum().reset_index()
 
+    activity_dfs = dict(list(grouped_df.groupby('Activity Category', sort=False)))
     for activity, details in fetch_activities().items():
-        activity_df = grouped_df[grouped_df['Activity Category'] == activity]
+        activity_df = activity_dfs.get(activity, grouped_df.iloc[:0])
 
         fig.add_trace(go.Bar(
             x=activity_df['Date'],
@@ -130,8 +118,9 @@ def generate_duration_count_chart(df):
 
 def main():
     df = fetch_time_blocks()
-    productive_df = fetch_productive_time_blocks()
-    chill_df = fetch_chill_time_blocks()
+    # Filter the subsets from the same frame rather than scanning the notes again
+    productive_df = fetch_productive_time_blocks(df)
+    chill_df = fetch_chill_time_blocks(df)
     # Plot the time blocks as a stacked bar chart
     fig1 = generate_time_blocks_heatmap(df)
     st.plotly_chart(fig1)